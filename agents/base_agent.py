@@ -1,12 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, AsyncIterator, List, Callable, Optional
+from langchain_core.messages import AIMessage
 from utils.data_manager import DataManager
+from utils.llm_router import get_router
+from models.records import compact_state
+from utils.profiler import AgentProfiler
+from utils.run_budget import current_budget, use_budget
 
 
 class BaseAgent(ABC):
-    def __init__(self, name: str):
+    # Set by the entry point's --profile flag; None keeps run() unwrapped
+    profiler: Optional[AgentProfiler] = None
+
+    def __init__(self, name: str, data_dir: str = "./data"):
         self.name = name
-        self.data_manager = DataManager()
+        self.data_manager = DataManager(data_dir)
+        self.router = get_router()
 
     @abstractmethod
     def save_state(self, state: Dict[str, Any], data: Any) -> None:
@@ -14,17 +24,94 @@ class BaseAgent(ABC):
         pass
 
     @abstractmethod
-    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the agent's main logic"""
         pass
 
+    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute the agent's main logic on a new event loop"""
+        return asyncio.run(self.aexecute(state))
+
+    async def ainvoke_llm(
+        self,
+        task: str,
+        messages: List[Any],
+        validate: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Invoke the model routed to this agent's task without blocking the loop"""
+        response = await self.router.ainvoke(f"{self.name}.{task}", messages, validate)
+        budget = current_budget.get()
+        if budget is not None:
+            budget.record_usage(messages, response)
+        return response
+
+    async def astream_llm(
+        self,
+        task: str,
+        messages: List[Any],
+        validate: Optional[Callable[[Any], bool]] = None,
+    ) -> AsyncIterator[str]:
+        """Stream the response of the model routed to this agent's task"""
+        chunks = []
+        async for chunk in self.router.astream(
+            f"{self.name}.{task}", messages, validate
+        ):
+            chunks.append(chunk)
+            yield chunk
+        budget = current_budget.get()
+        if budget is not None:
+            budget.record_usage(messages, AIMessage(content="".join(chunks)))
+
+    def get_data_manager(self, state: Dict[str, Any]) -> DataManager:
+        """Data manager of the run; a state "data_dir" overrides the agent's own"""
+        if state.get("data_dir"):
+            return DataManager(state["data_dir"])
+        return self.data_manager
+
     def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Main execution flow, profiled when a profiler is installed"""
+        if self.profiler is None:
+            return self._run(state)
+        with self.profiler.profile(self.name):
+            return self._run(state)
+
+    def save_output(
+        self, state: Dict[str, Any], data_manager: DataManager, data: Any
+    ) -> None:
+        """Save the output for later runs of the day
+
+        Once the budget degraded this or an earlier stage the output is
+        incomplete or built on incomplete input, so it is not saved and
+        later runs recompute it.
+        """
+        budget = state.get("run_budget")
+        if budget is not None and budget.degradations:
+            print(f"Not saving {self.name} output, the run budget degraded the run")
+            return
+        data_manager.save_agent_output(self.name, data)
+
+    def _run(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Main execution flow with data persistence"""
-        latest_data = self.data_manager.get_latest_agent_output(self.name)
+        data_manager = self.get_data_manager(state)
+        latest_data = data_manager.get_latest_agent_output(self.name)
+        if self.save_state(state, latest_data):
+            print(f"Skipping {self.name} as data from today already exists")
+            return compact_state(state)
+
+        with use_budget(state.get("run_budget")):
+            result, data = self.execute(state)
+        self.save_output(state, data_manager, data)
+        return compact_state(result)
+
+    async def arun(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Async execution flow with data persistence"""
+        data_manager = self.get_data_manager(state)
+        latest_data = data_manager.get_latest_agent_output(self.name)
         if self.save_state(state, latest_data):
             print(f"Skipping {self.name} as data from today already exists")
-            return state
+            return compact_state(state)
 
-        result, data = self.execute(state)
-        self.data_manager.save_agent_output(self.name, data)
-        return result
+        with use_budget(state.get("run_budget")):
+            result, data = await self.aexecute(state)
+        self.save_output(state, data_manager, data)
+        return compact_state(result)
@@ -1,21 +1,35 @@
 from typing import Dict, Any, List
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
 import asyncio
 from tavily import AsyncTavilyClient
 from .base_agent import BaseAgent
-from langchain_openai import ChatOpenAI
+from models.records import Article
+from utils.single_flight import SingleFlight
+from utils.news_store import NewsStore, parse_published
+from utils.local_search import LocalSearchClient
+from utils.metrics_matrix import get_selected_techs
+from utils.run_budget import get_run_budget
+from utils.hedging import HedgedCaller
 from langchain.prompts import ChatPromptTemplate
 
 
 class NewsCollectorAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("news_collector")
+    def __init__(self, data_dir: str = "./data"):
+        super().__init__("news_collector", data_dir)
         self.api_key = os.getenv("TAVILY_API_KEY")
-        if not self.api_key:
+        fixture_path = os.getenv("NEWS_SEARCH_FIXTURES")
+        if fixture_path:
+            # Offline runs and tests search a local file instead of Tavily
+            self.async_client = LocalSearchClient(fixture_path)
+        elif not self.api_key:
             raise ValueError("TAVILY_API_KEY environment variable is not set")
-        self.async_client = AsyncTavilyClient(api_key=self.api_key)
-        self.llm = ChatOpenAI(model="gpt-4")
+        else:
+            self.async_client = AsyncTavilyClient(api_key=self.api_key)
+        # Searches are bounded by TAVILY_TIMEOUT_SECONDS and hedged with TAVILY_HEDGE
+        self.search_caller = HedgedCaller.from_env("TAVILY", timeout=30)
+        # Concurrent runs needing news for the same tech share one search
+        self.search_flight = SingleFlight()
         self.summary_prompt = ChatPromptTemplate.from_messages(
             [
                 (
@@ -43,69 +57,117 @@ Return a summary that:
         state["collected_news"] = data
         return True
 
-    def summarize_article(self, content: str) -> str:
+    async def summarize_article(self, content: str) -> str:
         """Summarize article content using GPT"""
         try:
             message = self.summary_prompt.format_messages(article_content=content)
-            response = self.llm.invoke(message)
+            response = await self.ainvoke_llm(
+                "summarize_article",
+                message,
+                validate=lambda r: bool(r.content.strip()),
+            )
             return response.content.strip()
         except Exception as e:
             print(f"Error summarizing article: {e}")
             return content[:500] + "..."  # Fallback to truncated content
 
-    async def search_news_for_tech(self, tech: str) -> List[Dict[str, str]]:
-        """Search news for a specific technology using Tavily API"""
+    def get_news_store(self, state: Dict[str, Any]) -> NewsStore:
+        """News history of the run, kept in its data directory like the paper corpus"""
+        return NewsStore(data_dir=self.get_data_manager(state).base_dir)
+
+    async def search_news_for_tech(
+        self, tech: str, news_store: NewsStore, max_results: int = 10
+    ) -> List[Article]:
+        """Fetch news newer than the last fetch and merge it with the tech's history"""
+        fetched_at = datetime.now()
+        days = news_store.window_days(tech, fetched_at)
         try:
-            response = await self.async_client.search(
-                query=f"{tech} technology news",
-                max_results=10,
-                topic="news",
-                days=365 * 3,  # Last 3 years
-                include_images=True,
-                include_raw_content=True,
+            response = await self.search_caller.call(
+                f"{self.name}.search",
+                lambda: self.async_client.search(
+                    query=f"{tech} technology news",
+                    max_results=max_results,
+                    topic="news",
+                    days=days,
+                    include_images=True,
+                    include_raw_content=True,
+                ),
             )
 
-            articles = []
-            for i, result in enumerate(response["results"]):
-                raw_content = result.get("raw_content", "")
-                summary = self.summarize_article(raw_content)
-
-                article = {"title": result["title"], "summary": summary}
-                articles.append(article)
+            # Only articles not seen in earlier runs are summarized
+            known_urls = news_store.known_urls(tech)
+            results = [
+                result
+                for result in response["results"]
+                if result.get("url") and result["url"] not in known_urls
+            ]
+            summaries = await asyncio.gather(
+                *[
+                    self.summarize_article(result.get("raw_content") or "")
+                    for result in results
+                ]
+            )
+            print(f"Fetched {len(results)} new articles for {tech} (last {days} days)")
 
-            return articles
+            history = news_store.merge(
+                tech,
+                [
+                    {
+                        "title": result["title"],
+                        "summary": summary,
+                        "url": result["url"],
+                        "published": parse_published(result.get("published_date")),
+                    }
+                    for result, summary in zip(results, summaries)
+                ],
+                fetched_at,
+            )
         except Exception as e:
             print(f"Error searching news for {tech}: {e}")
-            return []
+            history = news_store.retained(
+                news_store.read(tech)["articles"].values(), fetched_at
+            )
+
+        return [Article.from_dict(article) for article in history[:max_results]]
 
     async def collect_news_async(
-        self, technologies: List[str]
-    ) -> Dict[str, List[Dict[str, str]]]:
+        self, technologies: List[str], news_store: NewsStore, max_results: int = 10
+    ) -> Dict[str, List[Article]]:
         """Collect news for multiple technologies asynchronously"""
-        tasks = [self.search_news_for_tech(tech) for tech in technologies]
+        # Only runs sharing a news store share a search
+        tasks = [
+            self.search_flight.do(
+                (news_store.store_dir, tech, max_results),
+                lambda tech=tech: self.search_news_for_tech(
+                    tech, news_store, max_results
+                ),
+            )
+            for tech in technologies
+        ]
         results = await asyncio.gather(*tasks)
         return dict(zip(technologies, results))
 
-    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Collect news articles for technologies with total_score >= 85"""
-        # Get technologies with total_score >= 85
-        high_score_techs = []
-        for tech, metrics in state.get("trend_metrics", {}).items():
-            if metrics.get("total_score", 0) >= 85:
-                high_score_techs.append(tech)
-                print(
-                    f"Collecting news for high-scoring technology: {tech} (score: {metrics['total_score']})"
-                )
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Collect news articles for the selected high-scoring technologies"""
+        # Under budget pressure keep only the best technologies for every later stage
+        budget = get_run_budget(state)
+        high_score_techs = budget.limit_techs(self.name, get_selected_techs(state))
+        state["selected_techs"] = high_score_techs
+        max_results = budget.article_limit(self.name, 10)
+        trend_metrics = state.get("trend_metrics", {})
+        for tech in high_score_techs:
+            print(
+                f"Collecting news for high-scoring technology: {tech} (score: {trend_metrics[tech]['total_score']})"
+            )
 
         if not high_score_techs:
-            print("No technologies found with total_score >= 85")
+            print("No technologies selected for news collection")
             state["collected_news"] = {}
             return state, {}
 
-        # Run async collection for high-scoring technologies
-        loop = asyncio.get_event_loop()
-        news_results = loop.run_until_complete(
-            self.collect_news_async(high_score_techs)
+        # Collect news for all high-scoring technologies concurrently
+        news_results = await self.collect_news_async(
+            high_score_techs, self.get_news_store(state), max_results
         )
 
         # Update state with collected news
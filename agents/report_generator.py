@@ -1,29 +1,23 @@
-from typing import Dict, Any, List
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import os
 from .base_agent import BaseAgent
-from langchain_openai import ChatOpenAI
+from utils.pdf_renderer import Block, render_report
+from utils.metrics_matrix import get_selected_techs
+from utils.context_bundle import format_context_tokens, get_context_bundle
+from utils.run_budget import BudgetExhausted, get_run_budget
 from langchain.prompts import ChatPromptTemplate
 from tqdm import tqdm
+import asyncio
 import time
 
 
 class ReportGeneratorAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("report_generator")
-        self.styles = getSampleStyleSheet()
-        self.title_style = ParagraphStyle(
-            "CustomTitle", parent=self.styles["Heading1"], fontSize=24, spaceAfter=30
-        )
-        self.heading_style = ParagraphStyle(
-            "CustomHeading", parent=self.styles["Heading2"], fontSize=18, spaceAfter=20
-        )
-        self.normal_style = self.styles["Normal"]
-        self.llm = ChatOpenAI(model="gpt-4")
+    def __init__(self, data_dir: str = "./data", output_dir: str = "outputs"):
+        super().__init__("report_generator", data_dir)
+        self.output_dir = output_dir
+        # Technologies per rendered section; sections are laid out in parallel
+        self.section_size = int(os.getenv("PDF_SECTION_SIZE", 25))
 
         # Report generation prompts
         self.overview_prompt = ChatPromptTemplate.from_messages(
@@ -45,7 +39,7 @@ Keep the overview clear, professional, and actionable. Limit to 3-4 paragraphs."
                     "user",
                     """Please create an executive summary based on the following data:
 
-High-Scoring Technologies (score >= 85):
+High-Scoring Technologies:
 {high_scoring_techs}
 
 Key Metrics Summary:
@@ -91,7 +85,7 @@ Recent News Highlights:
 Risk Analysis:
 {risk_analysis}
 
-Provide a comprehensive analysis focusing on concrete evidence and actionable insights.""",
+Provide a comprehensive analysis focusing on concrete evidence and actionable insights.{length_limit}""",
                 ),
             ]
         )
@@ -100,237 +94,229 @@ Provide a comprehensive analysis focusing on concrete evidence and actionable in
         return super().save_state(state, data)
 
     def prepare_metrics_summary(
-        self, trend_metrics: Dict[str, Dict[str, float]]
+        self, state: Dict[str, Any], selected_techs: List[str]
     ) -> str:
         """Prepare a concise summary of key metrics"""
-        summary = []
-        for tech, metrics in trend_metrics.items():
-            if metrics.get("total_score", 0) >= 85:
-                summary.append(f"{tech}:")
-                summary.append(
-                    f"- Market Adoption: {metrics.get('market_adoption', 0)}"
-                )
-                summary.append(
-                    f"- Research Activity: {metrics.get('research_activity', 0)}"
-                )
-                summary.append(f"- Total Score: {metrics.get('total_score', 0)}")
-                summary.append("")
-        return "\n".join(summary)
+        return "\n".join(
+            get_context_bundle(state, tech).text("metrics_summary")
+            for tech in selected_techs
+        )
 
-    def prepare_risk_summary(
-        self, risk_analysis: Dict[str, Dict[str, List[Dict[str, str]]]]
-    ) -> str:
+    def prepare_risk_summary(self, state: Dict[str, Any]) -> str:
         """Prepare a concise summary of critical risks and opportunities"""
-        summary = []
-        for tech, analysis in risk_analysis.items():
-            summary.append(f"{tech}:")
-
-            # Add top 2 risks
-            risks = analysis.get("risks", [])[:2]
-            if risks:
-                summary.append("Critical Risks:")
-                for risk in risks:
-                    summary.append(
-                        f"- {risk.get('title', '')}: {risk.get('impact', '')} impact"
-                    )
-
-            # Add top 2 opportunities
-            opportunities = analysis.get("opportunities", [])[:2]
-            if opportunities:
-                summary.append("Key Opportunities:")
-                for opp in opportunities:
-                    summary.append(
-                        f"- {opp.get('title', '')}: {opp.get('impact', '')} impact"
-                    )
-            summary.append("")
-        return "\n".join(summary)
+        return "\n".join(
+            get_context_bundle(state, tech).text("risk_summary")
+            for tech in state.get("risk_opportunity_analysis", {})
+        )
 
-    def prepare_news_highlights(
-        self, news: List[Dict[str, str]], max_articles: int = 3
-    ) -> str:
-        """Prepare a concise summary of recent news"""
-        highlights = []
-        for article in news[:max_articles]:
-            highlights.append(f"• {article['title']}")
-            highlights.append(f"  {article['summary'][:200]}...")
-            highlights.append("")
-        return "\n".join(highlights)
-
-    def generate_executive_summary(self, state: Dict[str, Any]) -> str:
+    async def generate_executive_summary(self, state: Dict[str, Any]) -> str:
         """Generate executive summary using OpenAI"""
         print("\nGenerating Executive Summary...")
         start_time = time.time()
 
         # Prepare data for the overview
-        high_scoring_techs = []
-        for tech, metrics in state.get("trend_metrics", {}).items():
-            if metrics.get("total_score", 0) >= 85:
-                high_scoring_techs.append(tech)
-
-        metrics_summary = self.prepare_metrics_summary(state.get("trend_metrics", {}))
-        risk_summary = self.prepare_risk_summary(
-            state.get("risk_opportunity_analysis", {})
-        )
+        high_scoring_techs = get_selected_techs(state)
+
+        metrics_summary = self.prepare_metrics_summary(state, high_scoring_techs)
+        risk_summary = self.prepare_risk_summary(state)
 
         # Generate overview
-        response = self.llm.invoke(
-            self.overview_prompt.format_messages(
-                high_scoring_techs="\n".join(high_scoring_techs),
-                metrics_summary=metrics_summary,
-                risk_summary=risk_summary,
+        try:
+            response = await self.ainvoke_llm(
+                "executive_summary",
+                self.overview_prompt.format_messages(
+                    high_scoring_techs="\n".join(high_scoring_techs),
+                    metrics_summary=metrics_summary,
+                    risk_summary=risk_summary,
+                ),
             )
-        )
+        except BudgetExhausted:
+            return "Executive summary skipped: the run budget was used up."
+        except Exception as e:
+            print(f"Error generating executive summary: {e}")
+            return "Executive summary unavailable: the summary call failed."
 
         end_time = time.time()
         print(f"Executive Summary generated in {end_time - start_time:.2f} seconds")
         return response.content
 
-    def generate_tech_analysis(self, tech: str, state: Dict[str, Any]) -> str:
+    async def generate_tech_analysis(
+        self, tech: str, state: Dict[str, Any], max_words: Optional[int] = None
+    ) -> str:
         """Generate detailed analysis for a specific technology"""
-        metrics = state.get("trend_metrics", {}).get(tech, {})
-        news = state.get("collected_news", {}).get(tech, [])
-        risk_analysis = state.get("risk_opportunity_analysis", {}).get(tech, {})
-
-        # Format metrics
-        metrics_text = "\n".join(
-            [
-                f"- {key}: {value}"
-                for key, value in metrics.items()
-                if key != "total_score"
-            ]
-        )
-
-        # Format risk analysis
-        risk_text = []
-        for risk in risk_analysis.get("risks", []):
-            risk_text.append(f"• {risk.get('title', '')}")
-            risk_text.append(f"  Impact: {risk.get('impact', '')}")
-            risk_text.append(f"  {risk.get('explanation', '')}")
-        for opp in risk_analysis.get("opportunities", []):
-            risk_text.append(f"• {opp.get('title', '')}")
-            risk_text.append(f"  Impact: {opp.get('impact', '')}")
-            risk_text.append(f"  {opp.get('explanation', '')}")
+        bundle = get_context_bundle(state, tech)
 
         # Generate analysis
-        response = self.llm.invoke(
+        response = await self.ainvoke_llm(
+            "tech_analysis",
             self.tech_detail_prompt.format_messages(
                 tech=tech,
-                metrics=metrics_text,
-                news_highlights=self.prepare_news_highlights(news),
-                risk_analysis="\n".join(risk_text),
-            )
+                metrics=bundle.text("metrics"),
+                news_highlights=bundle.text("news_highlights"),
+                risk_analysis=bundle.text("risk_detail"),
+                length_limit=f"\nKeep it under {max_words} words." if max_words else "",
+            ),
         )
         return response.content
 
-    def create_technology_section(self, tech: str, data: Dict[str, Any]) -> List:
+    def create_technology_section(
+        self, tech: str, data: Dict[str, Any], analysis: str
+    ) -> List[Block]:
         """Create a section for a single technology"""
-        elements = []
+        blocks = []
 
         # Technology title
-        elements.append(Paragraph(tech, self.heading_style))
+        blocks.append(("heading", tech))
 
-        # Generate detailed analysis
-        analysis = self.generate_tech_analysis(tech, data)
-        elements.append(Paragraph(analysis, self.normal_style))
-        elements.append(Spacer(1, 20))
+        # Add detailed analysis (left out when the run budget skipped it)
+        if analysis:
+            blocks.append(("paragraph", analysis))
+            blocks.append(("spacer", 20))
 
         # Add metrics table if available
         metrics = data.get("trend_metrics", {}).get(tech, {})
         if metrics:
-            elements.append(Paragraph("Key Metrics", self.normal_style))
-            metrics_data = [
-                ["Metric", "Value"],
-                ["Market Adoption", f"{metrics.get('market_adoption', 0)}"],
-                ["Research Activity", f"{metrics.get('research_activity', 0)}"],
-                ["Investment Interest", f"{metrics.get('investment_interest', 0)}"],
-                ["Media Coverage", f"{metrics.get('media_coverage', 0)}"],
-                ["Future Potential", f"{metrics.get('future_potential', 0)}"],
-                ["Total Score", f"{metrics.get('total_score', 0)}"],
-            ]
-            t = Table(metrics_data, colWidths=[200, 100])
-            t.setStyle(
-                TableStyle(
-                    [
-                        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                        ("FONTSIZE", (0, 0), (-1, 0), 14),
-                        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                        ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                        ("TEXTCOLOR", (0, 1), (-1, -1), colors.black),
-                        ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
-                        ("FONTSIZE", (0, 1), (-1, -1), 12),
-                        ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                    ]
-                )
+            blocks.append(("paragraph", "Key Metrics"))
+            blocks.append(("metrics_table", metrics))
+            blocks.append(("spacer", 20))
+
+        blocks.append(("spacer", 30))
+        return blocks
+
+    async def prefetch_tech_analysis(self, tech: str, state: Dict[str, Any]) -> None:
+        """Write a technology's analysis as soon as its risk analysis is done
+
+        Called by the risk analyzer per finished technology, so these calls
+        overlap the risk analyses still running; the report reuses them.
+        """
+        budget = get_run_budget(state)
+        if budget.skip_deep_dive(self.name):
+            return
+        try:
+            analysis = await self.generate_tech_analysis(
+                tech, state, budget.section_words(self.name)
             )
-            elements.append(t)
-            elements.append(Spacer(1, 20))
-
-        elements.append(Spacer(1, 30))
-        return elements
-
-    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        except Exception as e:
+            print(f"Error analyzing {tech} ahead of the report: {e}")
+            return
+        state.setdefault("tech_analyses", {})[tech] = analysis
+
+    async def generate_section_analyses(
+        self, techs: List[str], state: Dict[str, Any]
+    ) -> Dict[str, str]:
+        """Generate the detailed analyses not written ahead, concurrently"""
+        analyses = {
+            tech: analysis
+            for tech, analysis in state.get("tech_analyses", {}).items()
+            if tech in techs
+        }
+        pending = [tech for tech in techs if tech not in analyses]
+        budget = get_run_budget(state)
+        if not pending or budget.skip_deep_dive(self.name):
+            return {tech: analyses.get(tech, "") for tech in techs}
+        max_words = budget.section_words(self.name)
+
+        with tqdm(total=len(pending), desc="Technology Analysis") as pbar:
+
+            async def analyze(tech: str) -> str:
+                try:
+                    analysis = await self.generate_tech_analysis(tech, state, max_words)
+                except BudgetExhausted:
+                    analysis = ""
+                except Exception as e:
+                    print(f"Error analyzing {tech}: {e}")
+                    analysis = ""
+                pbar.update(1)
+                return analysis
+
+            results = await asyncio.gather(*[analyze(tech) for tech in pending])
+        analyses.update(zip(pending, results))
+        return {tech: analyses[tech] for tech in techs}
+
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Generate the final PDF report"""
         print("\nStarting Report Generation...")
         start_time = time.time()
 
         # Create output directory if it doesn't exist
-        os.makedirs("outputs", exist_ok=True)
+        output_dir = state.get("output_dir") or self.output_dir
+        os.makedirs(output_dir, exist_ok=True)
 
         # Generate report filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_path = f"outputs/tech_trend_report_{timestamp}.pdf"
+        report_path = os.path.join(output_dir, f"tech_trend_report_{timestamp}.pdf")
 
-        # Create the PDF document
-        doc = SimpleDocTemplate(report_path, pagesize=letter)
-        elements = []
+        # Group the selected technologies by keyword category
+        selected = set(get_selected_techs(state))
+        high_scoring_techs = {}
+        for keyword, technologies in state["summarized_tech"].items():
+            high_scoring_techs[keyword] = [
+                tech for tech in technologies if tech in selected
+            ]
 
-        # Title
-        elements.append(Paragraph("Technology Trend Analysis Report", self.title_style))
-        elements.append(
-            Paragraph(
-                f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                self.normal_style,
+        # Generate the executive summary and every section analysis concurrently
+        section_techs = list(
+            dict.fromkeys(
+                tech for techs in high_scoring_techs.values() for tech in techs
             )
         )
-        elements.append(Spacer(1, 30))
-
-        # Generate and add executive summary
-        elements.append(Paragraph("Executive Summary", self.heading_style))
-        summary = self.generate_executive_summary(state)
-        elements.append(Paragraph(summary, self.normal_style))
-        elements.append(Spacer(1, 30))
+        print(f"\nAnalyzing {len(section_techs)} high-scoring technologies...")
+        print(
+            format_context_tokens(
+                [get_context_bundle(state, tech) for tech in section_techs],
+                "metrics",
+                "news_highlights",
+                "risk_detail",
+            )
+        )
+        summary, analyses = await asyncio.gather(
+            self.generate_executive_summary(state),
+            self.generate_section_analyses(section_techs, state),
+        )
 
-        # Filter technologies with total score >= 85
-        high_scoring_techs = {}
-        for keyword, technologies in state["summarized_tech"].items():
-            high_scoring_techs[keyword] = []
-            for tech in technologies:
-                metrics = state.get("trend_metrics", {}).get(tech, {})
-                if metrics.get("total_score", 0) >= 85:
-                    high_scoring_techs[keyword].append(tech)
-
-        # Process each high-scoring technology
-        total_techs = sum(len(techs) for techs in high_scoring_techs.values())
-        print(f"\nAnalyzing {total_techs} high-scoring technologies (score >= 85)...")
-
-        with tqdm(total=total_techs, desc="Technology Analysis") as pbar:
-            for keyword, technologies in high_scoring_techs.items():
-                if (
-                    technologies
-                ):  # Only add category if it has high-scoring technologies
-                    elements.append(
-                        Paragraph(f"Category: {keyword}", self.heading_style)
+        # Title and executive summary
+        front_matter = [
+            ("title", "Technology Trend Analysis Report"),
+            (
+                "paragraph",
+                f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            ),
+            ("spacer", 30),
+            ("heading", "Executive Summary"),
+            ("paragraph", summary),
+            ("spacer", 30),
+        ]
+        degradations = get_run_budget(state).degradations
+        if degradations:
+            front_matter.append(("heading", "Degradations Applied"))
+            front_matter.append(
+                (
+                    "paragraph",
+                    "This run came close to or used up its time or token "
+                    "budget, so the report was produced with reduced scope:",
+                )
+            )
+            front_matter.extend(("paragraph", f"• {d}") for d in degradations)
+            front_matter.append(("spacer", 30))
+        sections = [front_matter]
+
+        # One section per category, split so large categories spread over workers
+        for keyword, technologies in high_scoring_techs.items():
+            if (
+                not technologies
+            ):  # Only add category if it has high-scoring technologies
+                continue
+            for i in range(0, len(technologies), self.section_size):
+                blocks = [("heading", f"Category: {keyword}")] if i == 0 else []
+                for tech in technologies[i : i + self.section_size]:
+                    blocks.extend(
+                        self.create_technology_section(tech, state, analyses[tech])
                     )
-                    for tech in technologies:
-                        elements.extend(self.create_technology_section(tech, state))
-                        pbar.update(1)
+                sections.append(blocks)
 
-        print("\nGenerating PDF...")
-        # Build the PDF
-        doc.build(elements)
+        print(f"\nGenerating PDF from {len(sections)} sections...")
+        # Render off the event loop; layout is CPU-bound and runs in a process pool
+        await asyncio.to_thread(render_report, report_path, sections)
 
         end_time = time.time()
         print(f"\nReport generation completed in {end_time - start_time:.2f} seconds")
@@ -1,12 +1,17 @@
 from typing import Dict, Any, List
+import asyncio
 import arxiv
-from datetime import datetime, timedelta
+import os
+from datetime import datetime, timedelta, timezone
 from .base_agent import BaseAgent
+from utils.paper_corpus import PaperCorpus
 
 
 class ResearchCollectorAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("research_collector")
+    def __init__(self, data_dir: str = "./data"):
+        super().__init__("research_collector", data_dir)
+        # Maximum number of new papers fetched per keyword and run
+        self.sync_limit = int(os.getenv("ARXIV_SYNC_LIMIT", 10))
 
     def save_state(self, state: Dict[str, Any], data: Any) -> None:
         """Save the collected papers to the state"""
@@ -15,37 +20,77 @@ class ResearchCollectorAgent(BaseAgent):
         state["collected_papers"] = data
         return True
 
-    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Collect research papers for each keyword"""
-        collected_papers = {}
+    def paper_record(self, result: arxiv.Result) -> Dict[str, Any]:
+        """Paper details kept in the corpus and the state"""
+        return {
+            "id": result.get_short_id().rsplit("v", 1)[0],
+            "entry_id": result.entry_id,
+            "title": result.title,
+            "summary": result.summary,
+            "published": result.published.isoformat(),
+            "categories": result.categories,
+        }
+
+    def collect_papers(self, keyword: str, corpus: PaperCorpus) -> List[Dict[str, Any]]:
+        """Sync new papers for a keyword into the corpus and return its papers"""
+        # Only papers from the last 3 years are collected
+        min_year = datetime.now().year - 3
+        window_start = datetime(min_year, 1, 1, tzinfo=timezone.utc)
+        try:
+            last_sync = corpus.last_sync(keyword)
 
-        for keyword in state["keyword_list"]:
-            try:
-                # Construct search query
+            # Construct search query: the most relevant papers on the first
+            # sync, afterwards the newest papers submitted since the newest
+            # stored one; the backlog beyond a capped fetch is not crawled
+            if last_sync is None:
                 search = arxiv.Search(
                     query=keyword,
                     max_results=10,
                     sort_by=arxiv.SortCriterion.Relevance,
                     sort_order=arxiv.SortOrder.Descending,
                 )
+            else:
+                last_sync = max(last_sync, window_start)
+                since = last_sync.astimezone(timezone.utc).strftime("%Y%m%d%H%M")
+                until = datetime.now(timezone.utc).strftime("%Y%m%d%H%M")
+                search = arxiv.Search(
+                    query=f"({keyword}) AND submittedDate:[{since} TO {until}]",
+                    max_results=self.sync_limit,
+                    sort_by=arxiv.SortCriterion.SubmittedDate,
+                    sort_order=arxiv.SortOrder.Descending,
+                )
+
+            fetched = [
+                self.paper_record(result)
+                for result in search.results()
+                if last_sync is None or result.published > last_sync
+            ]
 
-                papers = []
-                for result in search.results():
-                    # Get paper details
-                    paper = {
-                        "title": result.title,
-                        "summary": result.summary,
-                    }
+            new_ids = set(corpus.merge(keyword, fetched, floor=window_start))
+            print(f"Fetched {len(new_ids)} new papers for {keyword}")
 
-                    # Only include papers from the last 3 years
-                    if result.published.year >= datetime.now().year - 3:
-                        papers.append(paper)
+        except Exception as e:
+            print(f"Error processing keyword {keyword}: {e}")
+            new_ids = set()
 
-                collected_papers[keyword] = papers
+        return [
+            {**paper, "is_new": paper["id"] in new_ids}
+            for paper in corpus.papers_for(keyword)
+            if int(paper["published"][:4]) >= min_year
+        ]
 
-            except Exception as e:
-                print(f"Error processing keyword {keyword}: {e}")
-                collected_papers[keyword] = []
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Collect research papers for each keyword"""
+        # The arxiv client is blocking, so each keyword is searched in a thread
+        keywords = state["keyword_list"]
+        corpus = PaperCorpus(data_dir=self.get_data_manager(state).base_dir)
+        results = await asyncio.gather(
+            *[
+                asyncio.to_thread(self.collect_papers, keyword, corpus)
+                for keyword in keywords
+            ]
+        )
+        collected_papers = dict(zip(keywords, results))
 
         # Update state with collected papers
         state["collected_papers"] = collected_papers
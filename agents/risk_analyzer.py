@@ -1,13 +1,21 @@
-from typing import Dict, Any, List
-from langchain_openai import ChatOpenAI
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+import asyncio
 from langchain.prompts import ChatPromptTemplate
 from .base_agent import BaseAgent
+from utils.retrieval import build_evidence_index
+from utils.context_bundle import format_context_tokens, get_context_bundle
+from utils.risk_parser import RiskAnalysisParser, parse_risk_analysis
+from utils.run_budget import BudgetExhausted, get_run_budget
 
 
 class RiskAnalyzerAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("risk_analyzer")
-        self.llm = ChatOpenAI(model="gpt-4")
+    def __init__(self, data_dir: str = "./data"):
+        super().__init__("risk_analyzer", data_dir)
+        # Called with (tech, state) as soon as a technology's analysis is
+        # complete, so downstream work overlaps the analyses still streaming
+        self.on_tech_complete: Optional[
+            Callable[[str, Dict[str, Any]], Awaitable[None]]
+        ] = None
         self.prompt = ChatPromptTemplate.from_messages(
             [
                 (
@@ -68,65 +76,75 @@ Provide a detailed analysis of risks and opportunities based on the news coverag
 
     def parse_analysis(self, content: str) -> Dict[str, List[Dict[str, str]]]:
         """Parse the LLM response into structured risk and opportunity data"""
-        risks = []
-        opportunities = []
-        current_section = None
-        current_item = None
-
-        for line in content.split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-
-            if "RISKS:" in line:
-                current_section = "risks"
-                continue
-            elif "OPPORTUNITIES:" in line:
-                current_section = "opportunities"
-                continue
-
-            if line[0].isdigit() and "." in line:
-                if current_item:
-                    if current_section == "risks":
-                        risks.append(current_item)
-                    else:
-                        opportunities.append(current_item)
-                current_item = {"title": line.split(".", 1)[1].strip()}
-            elif current_item and line.startswith("- "):
-                key, value = line[2:].split(":", 1)
-                current_item[key.lower()] = value.strip()
-
-        # Add the last item
-        if current_item:
-            if current_section == "risks":
-                risks.append(current_item)
-            else:
-                opportunities.append(current_item)
-
-        return {"risks": risks, "opportunities": opportunities}
-
-    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return parse_risk_analysis(content)
+
+    def has_items(self, response: Any) -> bool:
+        """Whether a response contains at least one risk or opportunity"""
+        return any(self.parse_analysis(response.content).values())
+
+    async def stream_analysis(
+        self, tech: str, news_text: str, task: str = "analyze_risks"
+    ) -> AsyncIterator[Tuple[str, Dict[str, str]]]:
+        """Yield (section, item) pairs of one technology as each item completes"""
+        messages = self.prompt.format_messages(tech=tech, news=news_text)
+
+        parser = RiskAnalysisParser()
+        try:
+            async for chunk in self.astream_llm(task, messages, self.has_items):
+                for section, item in parser.feed(chunk):
+                    yield section, item
+            for section, item in parser.close():
+                yield section, item
+        except BudgetExhausted:
+            return
+        except Exception as e:
+            print(f"Error streaming risk analysis for {tech}: {e}")
+        if any(parser.result().values()):
+            return
+
+        # Nothing usable was streamed: retry as a validated call that can escalate
+        try:
+            response = await self.ainvoke_llm(task, messages, validate=self.has_items)
+        except BudgetExhausted:
+            return
+        except Exception as e:
+            print(f"Error analyzing risks for {tech}: {e}")
+            return
+        for section, items in self.parse_analysis(response.content).items():
+            for item in items:
+                yield section, item
+
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze risks and opportunities for each technology based on news"""
-        risk_opportunity_analysis = {}
-
-        for tech, news in state["collected_news"].items():
-            # Format news articles for the prompt
-            news_text = "\n\n".join(
-                [
-                    f"Title: {article['title']}\nSummary: {article['summary']}"
-                    for article in news
-                ]
-            )
-
-            # Generate analysis using LLM
-            response = self.llm.invoke(
-                self.prompt.format_messages(tech=tech, news=news_text)
-            )
-
-            # Parse the structured response
-            analysis = self.parse_analysis(response.content)
-            risk_opportunity_analysis[tech] = analysis
-
-        # Update state with risk analysis
+        # Index papers and news once so each prompt carries only relevant passages
+        build_evidence_index(state)
+
+        # Items are added to the state as they stream in, and each finished
+        # technology is handed downstream while the others still stream
+        techs = list(state["collected_news"].keys())
+        risk_opportunity_analysis = {
+            tech: {"risks": [], "opportunities": []} for tech in techs
+        }
         state["risk_opportunity_analysis"] = risk_opportunity_analysis
+
+        # Prompt material is rendered once per technology; sizes are known up front
+        bundles = {tech: get_context_bundle(state, tech) for tech in techs}
+        print(format_context_tokens(list(bundles.values()), "evidence"))
+
+        budget = get_run_budget(state)
+
+        async def analyze(tech: str) -> None:
+            # Checked per technology: cheaper pass first, then none at all
+            if budget.skip_risk_analysis(self.name):
+                return
+            task = "analyze_risks"
+            if budget.fast_risk_analysis(self.name):
+                task = "analyze_risks_fast"
+            news_text = bundles[tech].text("evidence")
+            async for section, item in self.stream_analysis(tech, news_text, task):
+                risk_opportunity_analysis[tech][section].append(item)
+            if self.on_tech_complete is not None:
+                await self.on_tech_complete(tech, state)
+
+        await asyncio.gather(*[analyze(tech) for tech in techs])
         return state, risk_opportunity_analysis
@@ -1,13 +1,14 @@
 from typing import Dict, Any, List
+import asyncio
 from .base_agent import BaseAgent
-from langchain_openai import ChatOpenAI
+from utils.paper_corpus import PaperCorpus
+from utils.run_budget import RunBudget, get_run_budget
 from langchain.prompts import ChatPromptTemplate
 
 
 class TechSummarizerAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("tech_summarizer")
-        self.llm = ChatOpenAI(model="gpt-4")
+    def __init__(self, data_dir: str = "./data"):
+        super().__init__("tech_summarizer", data_dir)
         self.prompt = ChatPromptTemplate.from_messages(
             [
                 (
@@ -45,40 +46,76 @@ class TechSummarizerAgent(BaseAgent):
         state["summarized_tech"] = data
         return True
 
-    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract main technology terms from collected papers"""
-        summarized_tech = {}
-
-        for keyword, papers in state["collected_papers"].items():
-            try:
-                # Combine all paper titles and summaries
-                paper_texts = "\n".join(
-                    [
-                        f"Title: {paper['title']}\nSummary: {paper['summary']}"
-                        for paper in papers
-                    ]
-                )
+    async def extract_terms(
+        self,
+        keyword: str,
+        papers: List[Dict[str, str]],
+        corpus: PaperCorpus,
+        budget: RunBudget,
+    ) -> List[str]:
+        """Extract main technology terms from the papers of one keyword
 
-                # Get technology terms from LLM
-                response = self.llm.invoke(
-                    self.prompt.format_messages(paper_texts=paper_texts)
-                )
+        Papers tracked in the corpus are only sent to the LLM once; their
+        terms are merged with the recent terms already extracted for the
+        keyword. Under budget pressure only the newest papers are sent, the
+        others stay unsummarized for the next run.
+        """
+        tracked = all("id" in paper for paper in papers)
+        summarized = {"ids": set(), "terms": []}
+        if tracked:
+            summarized = corpus.summarized(keyword)
+            papers = [p for p in papers if p["id"] not in summarized["ids"]]
+            if not papers:
+                print(f"No new papers for {keyword}, reusing extracted terms")
+                return summarized["terms"]
+        papers = budget.limit_papers(self.name, papers)
 
-                # Process the response to get a list of terms
-                terms = [
-                    term.strip()
-                    for term in response.content.split("\n")
-                    if term.strip()
+        try:
+            # Combine all paper titles and summaries
+            paper_texts = "\n".join(
+                [
+                    f"Title: {paper['title']}\nSummary: {paper['summary']}"
+                    for paper in papers
                 ]
+            )
+
+            # Get technology terms from LLM
+            response = await self.ainvoke_llm(
+                "extract_terms",
+                self.prompt.format_messages(paper_texts=paper_texts),
+                validate=lambda r: bool(r.content.strip()),
+            )
+
+            # Process the response to get a list of terms
+            terms = [
+                term.strip() for term in response.content.split("\n") if term.strip()
+            ]
+
+            # Remove duplicates while preserving order
+            unique_terms = list(dict.fromkeys(terms))
 
-                # Remove duplicates while preserving order
-                unique_terms = list(dict.fromkeys(terms))
+            if tracked:
+                return corpus.mark_summarized(keyword, papers, unique_terms)
+            return unique_terms
 
-                summarized_tech[keyword] = unique_terms
+        except Exception as e:
+            print(f"Error processing papers for {keyword}: {e}")
+            return summarized["terms"]
 
-            except Exception as e:
-                print(f"Error processing papers for {keyword}: {e}")
-                summarized_tech[keyword] = []
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract main technology terms from collected papers"""
+        keywords = list(state["collected_papers"].keys())
+        corpus = PaperCorpus(data_dir=self.get_data_manager(state).base_dir)
+        budget = get_run_budget(state)
+        results = await asyncio.gather(
+            *[
+                self.extract_terms(
+                    keyword, state["collected_papers"][keyword], corpus, budget
+                )
+                for keyword in keywords
+            ]
+        )
+        summarized_tech = dict(zip(keywords, results))
 
         # Update state with summarized technologies
         state["summarized_tech"] = summarized_tech
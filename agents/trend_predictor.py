@@ -1,16 +1,18 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+import asyncio
+from itertools import zip_longest
 from datetime import datetime, timedelta
 from .base_agent import BaseAgent
-from langchain_openai import ChatOpenAI
+from utils.metrics_matrix import METRIC_KEYS, apply_metrics_selection
+from utils.run_budget import get_run_budget
 from langchain.prompts import ChatPromptTemplate
 import os
 import json
 
 
 class TrendPredictorAgent(BaseAgent):
-    def __init__(self):
-        super().__init__("trend_predictor")
-        self.llm = ChatOpenAI(model="gpt-4")
+    def __init__(self, data_dir: str = "./data"):
+        super().__init__("trend_predictor", data_dir)
         self.prompt = ChatPromptTemplate.from_messages(
             [
                 (
@@ -51,23 +53,38 @@ Base your analysis on your knowledge of the technology and its current state in
         if data is None:
             return False
         state["trend_metrics"] = data
+        apply_metrics_selection(state)
         return True
 
-    def analyze_trend(self, technology: str) -> Dict[str, float]:
+    def parse_metrics(self, content: str) -> Optional[Dict[str, float]]:
+        """Parse the LLM response, returning None if it is not a full metrics object"""
+        try:
+            metrics = json.loads(content)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(metrics, dict) or any(
+            key not in metrics for key in METRIC_KEYS
+        ):
+            return None
+        return metrics
+
+    async def analyze_trend(self, technology: str) -> Dict[str, float]:
         """Analyze technology trend using OpenAI"""
         try:
-            # Get trend analysis from LLM
+            # Get trend analysis from LLM, escalating if the JSON is unusable
             message = self.prompt.format_messages(technology=technology)
-            response = self.llm.invoke(message)
+            response = await self.ainvoke_llm(
+                "analyze_trend",
+                message,
+                validate=lambda r: self.parse_metrics(r.content) is not None,
+            )
 
             # Parse the response to get metrics
-            try:
-                metrics = json.loads(response.content)
-                return metrics
-            except json.JSONDecodeError as e:
-                print(f"Error parsing LLM response: {e}")
+            metrics = self.parse_metrics(response.content)
+            if metrics is None:
                 print(f"Raw response: {response.content}")
-                raise
+                raise ValueError("LLM response is not a valid metrics object")
+            return metrics
 
         except Exception as e:
             print(f"Error analyzing trend for {technology}: {e}")
@@ -80,18 +97,29 @@ Base your analysis on your knowledge of the technology and its current state in
                 "total_score": 0,
             }
 
-    def execute(self, state: Dict[str, Any]) -> Dict[str, Any]:
+    async def aexecute(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze trends for each technology"""
-        # Flatten technologies list
-        all_technologies = []
-        for technologies in state["summarized_tech"].values():
-            all_technologies.extend(technologies)
+        # Flatten technologies list, taking each keyword's terms in turn so a
+        # budget cap keeps the leading terms of every keyword
+        all_technologies = [
+            tech
+            for technologies in zip_longest(*state["summarized_tech"].values())
+            for tech in technologies
+            if tech is not None
+        ]
+        all_technologies = list(dict.fromkeys(all_technologies))
+        all_technologies = get_run_budget(state).limit_terms(
+            self.name, all_technologies
+        )
 
-        # Analyze each technology
-        trend_metrics = {}
-        for tech in all_technologies:
-            trend_metrics[tech] = self.analyze_trend(tech)
+        # Analyze each technology concurrently (bounded by the router)
+        results = await asyncio.gather(
+            *[self.analyze_trend(tech) for tech in all_technologies]
+        )
+        trend_metrics = dict(zip(all_technologies, results))
 
-        # Update state with trend metrics
+        # Update state with trend metrics and recompute total scores
         state["trend_metrics"] = trend_metrics
+        selected_techs = apply_metrics_selection(state)
+        print(f"Selected {len(selected_techs)} of {len(trend_metrics)} technologies")
         return state, trend_metrics
@@ -0,0 +1,179 @@
+#! python3
+"""Run the workflow for many keyword sets across worker processes
+
+Job file: JSON lines, each either {"id": "client-a", "keywords": [...]} or a
+plain list of keywords. Every job gets its own data and output directory
+under the run directory; LLM responses are cached in a directory shared by
+all workers, so prompts common to several jobs are only sent once.
+
+Re-running with the same job file and run directory resumes: jobs already
+marked done are skipped, everything else is run again.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Any, List
+from dotenv import load_dotenv
+from utils.data_manager import write_json_atomic
+from utils.pdf_renderer import share_workers
+
+CACHE_DIR = "./cache/llm"
+
+
+def load_jobs(path: str) -> List[Dict[str, Any]]:
+    """Read keyword sets from a JSON lines job file"""
+    jobs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            job = json.loads(line)
+            if isinstance(job, list):
+                job = {"keywords": job}
+            if "id" not in job:
+                digest = hashlib.sha1(json.dumps(job["keywords"]).encode("utf-8"))
+                job["id"] = digest.hexdigest()[:12]
+            jobs.append(job)
+    return jobs
+
+
+def status_path(run_dir: str, job_id: str) -> str:
+    return os.path.join(run_dir, "status", f"{job_id}.json")
+
+
+def read_status(run_dir: str, job_id: str) -> Dict[str, Any]:
+    try:
+        with open(status_path(run_dir, job_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"status": "pending"}
+
+
+def write_status(run_dir: str, job_id: str, status: Dict[str, Any]) -> None:
+    path = status_path(run_dir, job_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_json_atomic(path, status, indent=2)
+
+
+def run_job(job: Dict[str, Any], run_dir: str) -> Dict[str, Any]:
+    """Run one keyword set in a worker process and record its status"""
+    load_dotenv()
+    from workflow import run_workflow
+
+    job_dir = os.path.join(run_dir, "jobs", job["id"])
+    os.makedirs(job_dir, exist_ok=True)
+    status = {
+        "status": "running",
+        "keywords": job["keywords"],
+        "pid": os.getpid(),
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    write_status(run_dir, job["id"], status)
+
+    start_time = time.time()
+    with open(os.path.join(job_dir, "run.log"), "a", encoding="utf-8") as log:
+        with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+            try:
+                final_state = run_workflow(
+                    job["keywords"],
+                    data_dir=os.path.join(job_dir, "data"),
+                    output_dir=os.path.join(job_dir, "outputs"),
+                )
+                status.update(
+                    status="done",
+                    report=final_state["full_report"],
+                    degradations=final_state["run_budget"].degradations,
+                )
+            except Exception as e:
+                traceback.print_exc()
+                status.update(status="failed", error=f"{type(e).__name__}: {e}")
+
+    status["duration"] = round(time.time() - start_time, 2)
+    status["finished_at"] = datetime.now().isoformat(timespec="seconds")
+    write_status(run_dir, job["id"], status)
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("job_file", help="JSON lines file of keyword sets")
+    parser.add_argument("--run-dir", help="Status, data and reports of this run")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--cache-dir", help=f"Shared LLM cache (default: LLM_CACHE_DIR or {CACHE_DIR})"
+    )
+    args = parser.parse_args()
+
+    load_dotenv()
+    run_dir = args.run_dir or os.path.join(
+        "batch_runs", os.path.splitext(os.path.basename(args.job_file))[0]
+    )
+    os.makedirs(run_dir, exist_ok=True)
+    # Workers inherit the environment, so they all share one LLM cache
+    if args.cache_dir:
+        os.environ["LLM_CACHE_DIR"] = args.cache_dir
+    else:
+        os.environ.setdefault("LLM_CACHE_DIR", CACHE_DIR)
+    share_workers(args.workers)
+
+    jobs = load_jobs(args.job_file)
+    pending = [
+        job for job in jobs if read_status(run_dir, job["id"])["status"] != "done"
+    ]
+    print(
+        f"{len(jobs)} jobs, {len(jobs) - len(pending)} already done, "
+        f"running {len(pending)} on {args.workers} workers"
+    )
+
+    results = {}
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(run_job, job, run_dir): job for job in pending}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                status = future.result()
+            except Exception as e:  # The worker process itself died
+                status = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+                write_status(
+                    run_dir, job["id"], {**status, "keywords": job["keywords"]}
+                )
+            results[job["id"]] = status
+            print(
+                f"[{len(results)}/{len(pending)}] {job['id']} {status['status']}"
+                + (f" in {status['duration']}s" if "duration" in status else "")
+                + (f": {status['error']}" if status["status"] == "failed" else "")
+            )
+
+    elapsed = time.time() - start_time
+    done = sum(1 for s in results.values() if s["status"] == "done")
+    failed = [job_id for job_id, s in results.items() if s["status"] == "failed"]
+    summary = {
+        "jobs": len(jobs),
+        "skipped": len(jobs) - len(pending),
+        "done": done,
+        "failed": failed,
+        "elapsed": round(elapsed, 2),
+        "jobs_per_minute": round(len(results) / elapsed * 60, 2) if elapsed else 0,
+    }
+    with open(os.path.join(run_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    print(
+        f"\nDone: {done}, failed: {len(failed)}, skipped: {summary['skipped']} "
+        f"in {elapsed:.1f}s ({summary['jobs_per_minute']} jobs/min)"
+    )
+    if failed:
+        print("Re-run the same command to retry failed jobs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#! python3
+"""Measure report rendering time against technology count
+
+Compares a single in-process document with sections rendered in a process
+pool and merged.
+
+Usage: python benchmarks/pdf_render.py [tech_count ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.pdf_renderer import render_report, default_workers
+from utils.metrics_matrix import METRIC_KEYS
+
+SECTION_SIZE = 25
+ANALYSIS = " ".join(
+    ["The technology shows strong momentum across research and industry."] * 40
+)
+
+
+def build_sections(num_techs: int) -> list:
+    sections = [[("title", "Technology Trend Analysis Report"), ("spacer", 30)]]
+    metrics = {key: 90 for key in METRIC_KEYS + ["total_score"]}
+    for start in range(0, num_techs, SECTION_SIZE):
+        blocks = []
+        for i in range(start, min(start + SECTION_SIZE, num_techs)):
+            blocks.extend(
+                [
+                    ("heading", f"Technology {i}"),
+                    ("paragraph", ANALYSIS),
+                    ("spacer", 20),
+                    ("paragraph", "Key Metrics"),
+                    ("metrics_table", metrics),
+                    ("spacer", 50),
+                ]
+            )
+        sections.append(blocks)
+    return sections
+
+
+def timed(workers: int, sections: list, path: str) -> float:
+    start_time = time.perf_counter()
+    render_report(path, sections, workers=workers)
+    return time.perf_counter() - start_time
+
+
+def main():
+    counts = [int(n) for n in sys.argv[1:]] or [10, 50, 100, 200, 400]
+    workers = default_workers()
+    print(f"Workers: {workers}, technologies per section: {SECTION_SIZE}")
+    print(f"{'techs':>6}{'single (s)':>12}{'parallel (s)':>14}{'speedup':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "report.pdf")
+        for num_techs in counts:
+            sections = build_sections(num_techs)
+            single = timed(1, sections, path)
+            parallel = timed(workers, sections, path)
+            print(
+                f"{num_techs:>6}{single:>12.2f}{parallel:>14.2f}{single / parallel:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
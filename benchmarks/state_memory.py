@@ -0,0 +1,114 @@
+#! python3
+"""Measure state memory and per-stage overhead of dict vs compact state
+
+Usage: python benchmarks/state_memory.py [num_technologies]
+"""
+
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langgraph.graph import Graph
+from models.records import compact_state, to_serializable
+from utils.metrics_matrix import METRIC_KEYS, apply_metrics_selection
+
+KEYWORDS = ["AI", "LLM", "LLVM"]
+ARTICLES_PER_TECH = 10
+STAGES = 6
+
+
+def build_raw_state(num_techs: int) -> dict:
+    """State in the shape produced by JSON-loaded agent outputs"""
+    random.seed(0)
+    techs = [f"technology term {i}" for i in range(num_techs)]
+    pool = [
+        {"title": f"Article {i}", "summary": "Summary text " * 20, "url": f"u{i}"}
+        for i in range(num_techs)
+    ]
+    # Rebuilding strings mimics separate json.loads per agent output
+    state = {
+        "keyword_list": KEYWORDS,
+        "summarized_tech": {
+            k: ["".join(t) for t in techs[i :: len(KEYWORDS)]]
+            for i, k in enumerate(KEYWORDS)
+        },
+        "trend_metrics": {
+            "".join(t): {key: random.randint(50, 100) for key in METRIC_KEYS}
+            for t in techs
+        },
+        "collected_news": {
+            "".join(t): [dict(random.choice(pool)) for _ in range(ARTICLES_PER_TECH)]
+            for t in techs
+        },
+    }
+    return state
+
+
+def measure_memory(builder) -> tuple:
+    gc.collect()
+    tracemalloc.start()
+    state = builder()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return state, current
+
+
+def run_stages(state: dict, compact: bool) -> float:
+    """Pass the state through a six-node graph, as the workflow does"""
+    workflow = Graph()
+    for i in range(STAGES):
+        node = compact_state if compact else (lambda s: s)
+        workflow.add_node(f"stage_{i}", node)
+        if i:
+            workflow.add_edge(f"stage_{i - 1}", f"stage_{i}")
+    workflow.set_entry_point("stage_0")
+    workflow.set_finish_point(f"stage_{STAGES - 1}")
+    app = workflow.compile()
+
+    start_time = time.perf_counter()
+    app.invoke(state)
+    return (time.perf_counter() - start_time) / STAGES
+
+
+def main():
+    num_techs = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    raw_state, raw_bytes = measure_memory(lambda: build_raw_state(num_techs))
+    raw_stage = run_stages(raw_state, compact=False)
+    start_time = time.perf_counter()
+    json.dumps(raw_state["trend_metrics"])
+    json.dumps(raw_state["collected_news"])
+    raw_dump = time.perf_counter() - start_time
+    del raw_state
+
+    def build_compact():
+        state = build_raw_state(num_techs)
+        apply_metrics_selection(state)
+        return compact_state(state)
+
+    compact, compact_bytes = measure_memory(build_compact)
+    compact_stage = run_stages(compact, compact=True)
+    start_time = time.perf_counter()
+    json.dumps(compact["trend_metrics"], default=to_serializable)
+    json.dumps(compact["collected_news"], default=to_serializable)
+    compact_dump = time.perf_counter() - start_time
+
+    print(f"Technologies: {num_techs}, articles per tech: {ARTICLES_PER_TECH}")
+    print(f"{'':10}{'memory (MB)':>14}{'per stage (ms)':>16}{'serialize (ms)':>16}")
+    for label, size, stage, dump in [
+        ("dict", raw_bytes, raw_stage, raw_dump),
+        ("compact", compact_bytes, compact_stage, compact_dump),
+    ]:
+        print(
+            f"{label:10}{size / 2**20:>14.1f}{stage * 1000:>16.2f}{dump * 1000:>16.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,41 @@
 #! python3
 from workflow import run_workflow
+from utils.run_budget import RunBudget
+import argparse
 import os
 from dotenv import load_dotenv
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate a technology trend report")
+    parser.add_argument(
+        "keywords", nargs="*", default=["AI", "LLM", "LLVM"], help="Research keywords"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write per-agent cProfile, flamegraph stacks and allocations to outputs/profile",
+    )
+    parser.add_argument(
+        "--deadline", type=float, help="Seconds the run may take before agents degrade"
+    )
+    parser.add_argument(
+        "--token-budget",
+        type=int,
+        help="LLM tokens the run may use before agents degrade",
+    )
+    args = parser.parse_args()
+
     # Load environment variables
     load_dotenv()
 
-    # Example keywords
-    keywords = ["AI", "LLM", "LLVM"]
+    # Command line limits override RUN_DEADLINE_SECONDS / RUN_TOKEN_BUDGET
+    budget = RunBudget.from_env()
+    budget.deadline = args.deadline or budget.deadline
+    budget.token_budget = args.token_budget or budget.token_budget
 
     # Run the workflow
-    final_state = run_workflow(keywords)
+    final_state = run_workflow(args.keywords, profile=args.profile, budget=budget)
 
     # Print the report path
     print("end")
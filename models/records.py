@@ -0,0 +1,120 @@
+import sys
+from dataclasses import dataclass
+from typing import Dict, Any, Tuple
+
+
+@dataclass(slots=True)
+class Article:
+    """News article record shared by every technology that collected it"""
+
+    title: str
+    summary: str
+    url: str = ""
+
+    # Dict-style access keeps prompt formatting code working on records
+    def __getitem__(self, key: str) -> str:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def to_dict(self) -> Dict[str, str]:
+        article = {"title": self.title, "summary": self.summary}
+        if self.url:
+            article["url"] = self.url
+        return article
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]) -> "Article":
+        return cls(
+            title=sys.intern(data["title"]),
+            summary=data["summary"],
+            url=data.get("url", ""),
+        )
+
+
+class StateRegistry:
+    """Interned technology names and the shared pool of article records"""
+
+    def __init__(self):
+        self.techs: Dict[str, str] = {}
+        self.articles: Dict[Tuple[str, str], Article] = {}
+        self.compacted: Dict[str, Any] = {}
+
+    def needs_compaction(self, key: str, value: Any) -> bool:
+        """True unless this exact state entry was already compacted"""
+        if value is None or self.compacted.get(key) is value:
+            return False
+        self.compacted[key] = value
+        return True
+
+    def tech(self, name: str) -> str:
+        """Intern a technology name"""
+        return self.techs.setdefault(name, sys.intern(name))
+
+    def article(self, data: Any) -> Article:
+        """Return the shared record for an article dict or record"""
+        key = (data["title"], data.get("url", ""))
+        article = self.articles.get(key)
+        if article is None:
+            article = data if isinstance(data, Article) else Article.from_dict(data)
+            self.articles[key] = article
+        return article
+
+
+def get_registry(state: Dict[str, Any]) -> StateRegistry:
+    """Registry of the state, creating it if needed"""
+    if "registry" not in state:
+        state["registry"] = StateRegistry()
+    return state["registry"]
+
+
+def compact_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Intern technology names and share article records across the state
+
+    Called after every stage; entries already compacted by an earlier stage
+    are skipped, so each entry is only processed once per run.
+    """
+    registry = get_registry(state)
+
+    summarized_tech = state.get("summarized_tech")
+    if registry.needs_compaction("summarized_tech", summarized_tech):
+        for technologies in summarized_tech.values():
+            technologies[:] = [registry.tech(tech) for tech in technologies]
+
+    matrix = state.get("metrics_matrix")
+    if registry.needs_compaction("metrics_matrix", matrix):
+        matrix.techs[:] = [registry.tech(tech) for tech in matrix.techs]
+        matrix.index = {tech: i for i, tech in enumerate(matrix.techs)}
+        state["selected_techs"] = [
+            registry.tech(tech) for tech in state.get("selected_techs", [])
+        ]
+
+    if registry.needs_compaction("collected_news", state.get("collected_news")):
+        state["collected_news"] = {
+            registry.tech(tech): [registry.article(a) for a in articles]
+            for tech, articles in state["collected_news"].items()
+        }
+        registry.compacted["collected_news"] = state["collected_news"]
+
+    analysis = state.get("risk_opportunity_analysis")
+    if registry.needs_compaction("risk_opportunity_analysis", analysis):
+        state["risk_opportunity_analysis"] = {
+            registry.tech(tech): items for tech, items in analysis.items()
+        }
+        registry.compacted["risk_opportunity_analysis"] = state[
+            "risk_opportunity_analysis"
+        ]
+
+    return state
+
+
+def to_serializable(value: Any) -> Any:
+    """json.dump fallback for compact records and array-backed views"""
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+    return to_dict()
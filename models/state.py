@@ -1,8 +1,17 @@
-from typing import TypedDict, List, Dict
+from typing import TypedDict, List, Dict, Mapping
 from datetime import datetime
+from models.records import Article, StateRegistry
+from utils.metrics_matrix import MetricsMatrix
+from utils.retrieval import RetrievalIndex
+from utils.run_budget import RunBudget
+from utils.context_bundle import ContextBundle
 
 
 class State(TypedDict):
+    # [User Input] 실행별 데이터/보고서 디렉터리 (비어 있으면 Agent 기본값 사용)
+    data_dir: str
+    output_dir: str
+
     # [User Input] 사용자가 정의한 기술 키워드
     keyword_list: List[str]
 
@@ -12,15 +21,34 @@ class State(TypedDict):
     # [Agent B - TechSummarizerAgent] - 키워드별 핵심 기술 요약 결과
     summarized_tech: Dict[str, List[str]]
 
-    # [Agent C - TrendPredictorAgent] - 핵심 기술별 트렌드 분석 정보
-    trend_metrics: Dict[str, Dict[str, float]]
+    # [Agent C - TrendPredictorAgent] - 핵심 기술별 트렌드 분석 정보 (행렬 기반 읽기 전용 뷰)
+    trend_metrics: Mapping[str, Dict[str, float]]
+
+    # [Agent C - TrendPredictorAgent] - 가중치로 재계산한 메트릭스 행렬과 선택된 기술 목록
+    metrics_matrix: MetricsMatrix
+    selected_techs: List[str]
 
     # [Agent D - NewsCollectorAgent] - 핵심 기술별 수집된 뉴스 데이터
-    collected_news: Dict[str, List[Dict[str, str]]]
+    collected_news: Dict[str, List[Article]]
 
     # [Agent E - RiskOpportunityAnalyzerAgent] - 핵심 기술별 리스크 및 기회 분석
     risk_opportunity_analysis: Dict[str, Dict[str, List[str]]]
 
+    # [Agent E - RiskOpportunityAnalyzerAgent] - 논문/뉴스 검색 인덱스
+    evidence_index: RetrievalIndex
+
+    # [All Agents] - 인턴된 기술 이름과 공유 기사 레코드
+    registry: StateRegistry
+
+    # [All Agents] - 실행 마감 시간/토큰 예산과 적용된 성능 저하 단계
+    run_budget: RunBudget
+
+    # [Agent E → F] - 리스크 분석이 끝난 기술부터 미리 생성한 기술별 상세 분석
+    tech_analyses: Dict[str, str]
+
+    # [Agent E, F] - 기술별 프롬프트 컨텍스트 (실행당 한 번 생성, 부분별 지연 렌더링, 토큰 수 포함)
+    context_bundles: Dict[str, ContextBundle]
+
     # [Agent F - ReportGeneratorAgent] - 전체 결과를 종합한 PDF 보고서 경로
     full_report: str
 
@@ -0,0 +1,171 @@
+#! python3
+"""Long-running report service with warm agents and a job queue
+
+    python service.py --port 8000          # HTTP
+    python service.py --uds /tmp/trend.sock  # Unix socket
+
+POST /jobs {"keywords": [...]} queues a report and returns its job id,
+GET /jobs/{id} returns its status. Agents, model clients and the compiled
+graph are created once and shared by all jobs; identical LLM requests and
+news searches in flight at the same time are coalesced into one call.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import traceback
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Dict, Any, List
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+load_dotenv()
+
+from workflow import create_workflow, create_initial_state
+from utils.llm_router import get_router
+from utils.hedging import latency_stats
+from utils.pdf_renderer import share_workers
+
+RUNS_DIR = os.getenv("SERVICE_RUNS_DIR", "service_runs")
+WORKERS = int(os.getenv("SERVICE_WORKERS", 4))
+share_workers(WORKERS)
+
+
+class JobRequest(BaseModel):
+    keywords: List[str]
+
+
+class ReportService:
+    """Queue of report jobs processed by workers sharing one compiled graph"""
+
+    def __init__(self, runs_dir: str = RUNS_DIR, workers: int = WORKERS):
+        self.runs_dir = runs_dir
+        self.workers = workers
+        self.app = create_workflow(use_async=True).compile()
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self.tasks = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    def submit(self, keywords: List[str]) -> Dict[str, Any]:
+        """Queue a job, reusing a queued or running job with the same keywords"""
+        for job in self.jobs.values():
+            if job["keywords"] == keywords and job["status"] in ("queued", "running"):
+                return job
+
+        job_id = uuid.uuid4().hex[:12]
+        job = {
+            "id": job_id,
+            "keywords": keywords,
+            "status": "queued",
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.jobs[job_id] = job
+        self.queue.put_nowait(job_id)
+        return job
+
+    async def worker(self) -> None:
+        while True:
+            job = self.jobs[await self.queue.get()]
+            job.update(
+                status="running",
+                started_at=datetime.now().isoformat(timespec="seconds"),
+            )
+            job_dir = os.path.join(self.runs_dir, job["id"])
+            start_time = time.time()
+            try:
+                final_state = await self.app.ainvoke(
+                    create_initial_state(
+                        job["keywords"],
+                        data_dir=os.path.join(job_dir, "data"),
+                        output_dir=os.path.join(job_dir, "outputs"),
+                    )
+                )
+                job.update(
+                    status="done",
+                    report=final_state["full_report"],
+                    degradations=final_state["run_budget"].degradations,
+                )
+            except Exception as e:
+                traceback.print_exc()
+                job.update(status="failed", error=f"{type(e).__name__}: {e}")
+            finally:
+                job["duration"] = round(time.time() - start_time, 2)
+                self.queue.task_done()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.service = ReportService()
+    app.state.service.start()
+    yield
+    await app.state.service.stop()
+
+
+api = FastAPI(title="Technology Trend Report Service", lifespan=lifespan)
+
+
+@api.post("/jobs")
+async def submit_job(request: JobRequest) -> Dict[str, Any]:
+    if not request.keywords:
+        raise HTTPException(status_code=400, detail="keywords must not be empty")
+    return api.state.service.submit(request.keywords)
+
+
+@api.get("/jobs")
+async def list_jobs() -> List[Dict[str, Any]]:
+    return list(api.state.service.jobs.values())
+
+
+@api.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Dict[str, Any]:
+    job = api.state.service.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
+
+
+@api.get("/stats")
+async def stats() -> Dict[str, Any]:
+    service = api.state.service
+    router = get_router()
+    return {
+        "queued": service.queue.qsize(),
+        "jobs": {
+            status: sum(1 for job in service.jobs.values() if job["status"] == status)
+            for status in ("queued", "running", "done", "failed")
+        },
+        "models": router.stats,
+        "coalesced_llm_requests": router.single_flight.coalesced,
+        "latency": latency_stats.summary(),
+    }
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the report service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--uds", help="Listen on a Unix socket instead of TCP")
+    args = parser.parse_args()
+
+    if args.uds:
+        uvicorn.run(api, uds=args.uds)
+    else:
+        uvicorn.run(api, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
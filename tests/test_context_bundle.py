@@ -0,0 +1,49 @@
+import utils.context_bundle as context_bundle
+from utils.context_bundle import get_context_bundle
+
+
+def make_state():
+    return {
+        "collected_papers": {"AI": [{"title": "RL survey", "summary": "Agents."}]},
+        "summarized_tech": {"AI": ["RL"]},
+        "collected_news": {"RL": [{"title": "RL news", "summary": "Robots."}]},
+        "trend_metrics": {"RL": {"market_adoption": 70, "total_score": 300}},
+        "risk_opportunity_analysis": {"RL": {"risks": [], "opportunities": []}},
+    }
+
+
+def test_bundle_is_memoized_and_parts_are_lazy():
+    state = make_state()
+    bundle = get_context_bundle(state, "RL")
+    assert get_context_bundle(state, "RL") is bundle
+    assert bundle.parts == {}
+    assert "RL news" in bundle.text("news_highlights")
+    assert list(bundle.parts) == ["news_highlights"]
+
+
+def test_parts_are_rehashed_only_when_inputs_change(monkeypatch):
+    state = make_state()
+    bundle = get_context_bundle(state, "RL")
+    calls = []
+    cached_part = context_bundle.cached_part
+    monkeypatch.setattr(
+        context_bundle,
+        "cached_part",
+        lambda kind, *args: calls.append(kind) or cached_part(kind, *args),
+    )
+
+    assert bundle.text("risk_detail") == ""
+    assert bundle.text("risk_detail") == ""
+    assert calls == ["risk_detail"]
+
+    state["risk_opportunity_analysis"]["RL"]["risks"].append(
+        {"title": "Sim-to-real gap", "impact": "High", "explanation": "Costly."}
+    )
+    assert "Sim-to-real gap" in bundle.text("risk_detail")
+    assert calls == ["risk_detail", "risk_detail"]
+
+    bundle.tokens()
+    bundle.tokens()
+    assert sorted(calls[2:]) == sorted(
+        ["evidence", "news_highlights", "metrics", "metrics_summary", "risk_summary"]
+    )
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from utils.hedging import HedgedCaller, LatencyStats
+
+
+def caller(**kwargs):
+    stats = LatencyStats()
+    # Ten fast calls of history put the hedge delay at 10ms
+    stats.entry("agent.call")["latencies"].extend([0.01] * 10)
+    return HedgedCaller(hedge=True, min_samples=10, stats=stats, **kwargs)
+
+
+class Attempts:
+    """Async call whose attempts take the given delays in order"""
+
+    def __init__(self, *delays):
+        self.delays = list(delays)
+        self.started = 0
+        self.cancelled = []
+        self.finished = []
+
+    async def __call__(self):
+        attempt = self.started
+        self.started += 1
+        try:
+            await asyncio.sleep(self.delays[attempt])
+        except asyncio.CancelledError:
+            self.cancelled.append(attempt)
+            raise
+        self.finished.append(attempt)
+        return attempt
+
+
+def test_slow_call_is_hedged_and_the_loser_cancelled():
+    hedged = caller(timeout=5)
+    attempts = Attempts(1.0, 0.01)
+    assert asyncio.run(hedged.call("agent.call", attempts)) == 1
+    assert attempts.cancelled == [0]
+    entry = hedged.stats.entry("agent.call")
+    assert (entry["calls"], entry["hedged"], entry["hedge_wins"]) == (1, 1, 1)
+
+
+def test_fast_call_and_short_history_are_not_hedged():
+    hedged = caller(timeout=5)
+    attempts = Attempts(0.001)
+    assert asyncio.run(hedged.call("agent.call", attempts)) == 0
+    assert attempts.started == 1
+
+    unknown = Attempts(0.05)
+    assert asyncio.run(hedged.call("agent.other", unknown)) == 0
+    assert unknown.started == 1
+
+
+def test_timeout_covers_every_attempt():
+    hedged = caller(timeout=0.1)
+    attempts = Attempts(1.0, 1.0)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(hedged.call("agent.call", attempts))
+    assert sorted(attempts.cancelled) == [0, 1]
+    assert attempts.finished == []
+    assert hedged.stats.entry("agent.call")["timeouts"] == 1
+
+
+def test_failed_attempt_raises_its_error():
+    async def fail():
+        raise ValueError("bad response")
+
+    hedged = HedgedCaller(timeout=1, stats=LatencyStats())
+    with pytest.raises(ValueError):
+        asyncio.run(hedged.call("agent.call", fail))
+    assert hedged.stats.entry("agent.call")["errors"] == 1
+
+
+def test_cancelling_the_call_cancels_its_attempts():
+    hedged = caller(timeout=5)
+    attempts = Attempts(1.0, 1.0)
+
+    async def run():
+        task = asyncio.ensure_future(hedged.call("agent.call", attempts))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert sorted(attempts.cancelled) == [0, 1]
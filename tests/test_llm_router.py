@@ -0,0 +1,201 @@
+import json
+import math
+import asyncio
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from utils.llm_cache import LLMCache
+from utils.llm_router import LLMRouter, response_confidence
+
+MESSAGES = [HumanMessage(content="Score this technology")]
+
+
+class FakeModel:
+    """Chat model returning canned responses, or raising when given an exception"""
+
+    def __init__(self, name, responses):
+        self.name = name
+        self.responses = responses
+        self.calls = 0
+
+    def next_response(self):
+        response = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        if isinstance(response, Exception):
+            raise response
+        if isinstance(response, tuple):
+            content, probability = response
+            return AIMessage(
+                content=content,
+                response_metadata={
+                    "logprobs": {"content": [{"logprob": math.log(probability)}]}
+                },
+            )
+        return AIMessage(content=response)
+
+    def invoke(self, messages):
+        return self.next_response()
+
+    async def ainvoke(self, messages):
+        return self.next_response()
+
+
+def make_router(responses, **kwargs):
+    models = {name: FakeModel(name, replies) for name, replies in responses.items()}
+    router = LLMRouter(
+        routes={"default": "large", "agent.cheap": "small"},
+        escalation={"small": "large"},
+        model_factory=lambda name: models[name],
+        **kwargs,
+    )
+    return router, models
+
+
+def test_routes_by_task_then_default():
+    router, _ = make_router({})
+    assert router.model_for("agent.cheap") == "small"
+    assert router.model_for("agent.other") == "large"
+    router.routes["agent"] = "small"
+    assert router.model_for("agent.other") == "small"
+
+
+def test_uses_routed_model_when_response_is_valid():
+    router, models = make_router({"small": ["ok"], "large": ["unused"]})
+    response = router.invoke("agent.cheap", MESSAGES, validate=lambda r: True)
+    assert response.content == "ok"
+    assert models["large"].calls == 0
+    assert router.stats["small"]["calls"] == 1
+
+
+def test_escalates_when_validation_fails():
+    router, models = make_router({"small": ["bad"], "large": ["good"]})
+    response = router.invoke(
+        "agent.cheap", MESSAGES, validate=lambda r: r.content == "good"
+    )
+    assert response.content == "good"
+    assert router.stats["small"]["escalations"] == 1
+    assert models["large"].calls == 1
+
+
+def test_escalates_when_confidence_is_low():
+    router, _ = make_router(
+        {"small": [("unsure", 0.3)], "large": [("sure", 0.9)]}, min_confidence=0.5
+    )
+    response = router.invoke("agent.cheap", MESSAGES)
+    assert response.content == "sure"
+    assert router.stats["small"]["escalations"] == 1
+
+
+def test_confident_response_is_kept():
+    router, models = make_router(
+        {"small": [("sure", 0.8)], "large": ["unused"]}, min_confidence=0.5
+    )
+    assert router.invoke("agent.cheap", MESSAGES).content == "sure"
+    assert models["large"].calls == 0
+
+
+def test_response_without_logprobs_counts_as_confident():
+    assert response_confidence(AIMessage(content="plain")) is None
+    router, _ = make_router({"small": ["plain"]}, min_confidence=0.99)
+    assert router.invoke("agent.cheap", MESSAGES).content == "plain"
+
+
+def test_falls_back_when_model_raises():
+    router, _ = make_router({"small": [RuntimeError("down")], "large": ["good"]})
+    assert router.invoke("agent.cheap", MESSAGES).content == "good"
+    assert router.stats["small"]["errors"] == 1
+
+
+def test_raises_when_last_model_fails():
+    router, _ = make_router({"large": [RuntimeError("down")]})
+    with pytest.raises(RuntimeError):
+        router.invoke("agent.other", MESSAGES)
+
+
+def test_last_model_response_is_returned_even_if_invalid():
+    router, _ = make_router({"small": ["bad"], "large": ["still bad"]})
+    response = router.invoke("agent.cheap", MESSAGES, validate=lambda r: False)
+    assert response.content == "still bad"
+
+
+def test_async_escalation_and_fallback():
+    router, _ = make_router({"small": ["bad", RuntimeError("down")], "large": ["good"]})
+
+    async def run():
+        first = await router.ainvoke(
+            "agent.cheap", MESSAGES, validate=lambda r: r.content == "good"
+        )
+        second = await router.ainvoke(
+            "agent.cheap", [HumanMessage(content="Another prompt")]
+        )
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first.content == "good"
+    assert second.content == "good"
+    assert router.stats["small"]["escalations"] == 1
+    assert router.stats["small"]["errors"] == 1
+
+
+class StreamingModel(FakeModel):
+    async def astream(self, messages):
+        response = self.next_response()
+        for word in response.content.split(" "):
+            await asyncio.sleep(0)
+            yield AIMessage(content=f"{word} ")
+
+
+def make_cached_router(tmp_path, responses, **cache_kwargs):
+    models = {
+        name: StreamingModel(name, replies) for name, replies in responses.items()
+    }
+    router = LLMRouter(
+        routes={"default": "large"},
+        escalation={},
+        model_factory=lambda name: models[name],
+        cache=LLMCache(str(tmp_path), **cache_kwargs),
+    )
+    return router, models
+
+
+def test_invalid_response_is_not_cached(tmp_path):
+    router, models = make_cached_router(tmp_path, {"large": ["bad", "good"]})
+    validate = lambda r: r.content == "good"  # noqa: E731
+    assert router.invoke("agent.task", MESSAGES, validate).content == "bad"
+    assert router.invoke("agent.task", MESSAGES, validate).content == "good"
+    assert router.invoke("agent.task", MESSAGES, validate).content == "good"
+    assert models["large"].calls == 2
+    assert router.stats["large"]["cache_hits"] == 1
+
+
+def test_expired_and_other_epoch_entries_are_misses(tmp_path):
+    cache = LLMCache(str(tmp_path), ttl=60)
+    cache.set("key", "cached")
+    assert cache.get("key") == "cached"
+    assert LLMCache(str(tmp_path), ttl=60, epoch="v2").get("key") is None
+
+    with open(cache.path("key"), "r", encoding="utf-8") as f:
+        entry = json.load(f)
+    entry["created_at"] -= 120
+    with open(cache.path("key"), "w", encoding="utf-8") as f:
+        json.dump(entry, f)
+    assert cache.get("key") is None
+    assert LLMCache(str(tmp_path), ttl=None).get("key") == "cached"
+
+
+def test_identical_streams_share_one_call_and_cache(tmp_path):
+    router, models = make_cached_router(tmp_path, {"large": ["one two three"]})
+
+    async def consume():
+        return "".join(
+            [chunk async for chunk in router.astream("agent.task", MESSAGES)]
+        )
+
+    async def run():
+        return await asyncio.gather(consume(), consume(), consume())
+
+    results = asyncio.run(run())
+    assert len(set(results)) == 1 and results[0].split() == ["one", "two", "three"]
+    assert models["large"].calls == 1
+    assert router.single_flight.coalesced == 2
+    assert asyncio.run(consume()) == results[0]
+    assert router.stats["large"]["cache_hits"] == 1
@@ -0,0 +1,48 @@
+import pytest
+from utils.metrics_matrix import METRIC_KEYS, MetricsMatrix, load_selection_config
+
+
+def make_matrix(weights=None):
+    # total scores with equal weights: a=90, b=80, c=95, d=80
+    values = [[90] * 5, [80] * 5, [95] * 5, [80] * 5]
+    return MetricsMatrix(["a", "b", "c", "d"], values, weights)
+
+
+def test_weights_are_normalized_and_rescore():
+    matrix = make_matrix({"market_adoption": 3})
+    assert matrix.weights.sum() == pytest.approx(1.0)
+    matrix = MetricsMatrix(["x"], [[100, 0, 0, 0, 0]], {"market_adoption": 4})
+    assert matrix.total_scores[0] == 50
+
+
+def test_invalid_weights_are_rejected():
+    with pytest.raises(ValueError):
+        make_matrix({"market_adoption": -1})
+    with pytest.raises(ValueError):
+        make_matrix({key: 0 for key in METRIC_KEYS})
+
+
+def test_select_orders_by_score_keeping_ties_stable():
+    matrix = make_matrix()
+    assert [matrix.techs[i] for i in matrix.select()] == ["c", "a", "b", "d"]
+    assert [matrix.techs[i] for i in matrix.select(threshold=85)] == ["c", "a"]
+    assert [matrix.techs[i] for i in matrix.select(top_k=3)] == ["c", "a", "b"]
+    assert [matrix.techs[i] for i in matrix.select(threshold=85, top_k=1)] == ["c"]
+
+
+def test_select_with_non_positive_top_k_or_empty_matrix():
+    assert len(make_matrix().select(top_k=0)) == 0
+    assert len(make_matrix().select(top_k=-2)) == 0
+    empty = MetricsMatrix([], [])
+    assert len(empty.select(threshold=85, top_k=3)) == 0
+    assert empty.to_trend_metrics() == {}
+
+
+def test_top_k_alone_turns_the_default_threshold_off(monkeypatch):
+    monkeypatch.delenv("TREND_SCORE_THRESHOLD", raising=False)
+    monkeypatch.delenv("TREND_TOP_K", raising=False)
+    assert load_selection_config()["threshold"] == 85
+    monkeypatch.setenv("TREND_TOP_K", "3")
+    assert load_selection_config()["threshold"] is None
+    monkeypatch.setenv("TREND_SCORE_THRESHOLD", "70")
+    assert load_selection_config() == {"weights": {}, "threshold": 70, "top_k": 3}
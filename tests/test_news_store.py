@@ -0,0 +1,122 @@
+import json
+import asyncio
+import os
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from langchain_core.messages import AIMessage
+from utils.llm_router import LLMRouter, set_router
+from utils.local_search import LocalSearchClient
+from utils.news_store import NewsStore, parse_published
+
+
+def result(i, age_days, title="RAG news"):
+    published = datetime.now().astimezone() - timedelta(days=age_days)
+    return {
+        "title": f"{title} {i}",
+        "url": f"https://example.com/{i}",
+        "content": f"{title} content",
+        "raw_content": f"body {i}",
+        "published_date": format_datetime(published),
+    }
+
+
+def article(i, age_days):
+    published = datetime.now() - timedelta(days=age_days)
+    return {
+        "title": f"Article {i}",
+        "summary": "",
+        "url": f"https://example.com/{i}",
+        "published": published.isoformat(timespec="seconds"),
+    }
+
+
+def test_merge_dedups_by_url_and_keeps_first_summary(tmp_path):
+    store = NewsStore(str(tmp_path))
+    now = datetime.now()
+    store.merge("RAG", [article(1, 1)], now)
+    duplicate = {**article(1, 1), "summary": "resummarized"}
+    history = store.merge("RAG", [duplicate, article(2, 2)], now)
+    assert [a["url"] for a in history] == [
+        "https://example.com/1",
+        "https://example.com/2",
+    ]
+    assert history[0]["summary"] == ""
+    assert store.known_urls("RAG") == {a["url"] for a in history}
+
+
+def test_retention_caps_count_and_age(tmp_path):
+    store = NewsStore(str(tmp_path), max_articles=2, max_age_days=30)
+    history = store.merge(
+        "RAG",
+        [article(1, 40), article(2, 3), article(3, 1), article(4, 2)],
+        datetime.now(),
+    )
+    assert [a["title"] for a in history] == ["Article 3", "Article 4"]
+
+
+def test_window_covers_time_since_last_fetch(tmp_path):
+    store = NewsStore(str(tmp_path), max_age_days=30)
+    now = datetime.now()
+    assert store.window_days("RAG", now) == 30
+    store.merge("RAG", [], now - timedelta(days=3, hours=1))
+    assert store.window_days("RAG", now) == 4
+
+
+def test_parse_published_normalizes_formats():
+    assert parse_published("2024-05-01T10:00:00") == "2024-05-01T10:00:00"
+    assert parse_published("not a date") is None
+    assert parse_published(None) is None
+    rfc = format_datetime(datetime(2024, 5, 1, 10).astimezone())
+    assert parse_published(rfc) == "2024-05-01T10:00:00"
+
+
+def test_local_search_matches_terms_within_window(tmp_path):
+    fixture = tmp_path / "news.json"
+    fixture.write_text(
+        json.dumps(
+            [result(1, 5), result(2, 1), result(3, 40), result(4, 1, title="LLVM")]
+        )
+    )
+    client = LocalSearchClient(str(fixture))
+
+    response = asyncio.run(client.search("RAG technology news", max_results=5, days=10))
+    assert [r["title"] for r in response["results"]] == ["RAG news 2", "RAG news 1"]
+
+    response = asyncio.run(client.search("RAG", max_results=1, days=100))
+    assert [r["title"] for r in response["results"]] == ["RAG news 2"]
+    assert client.calls[-1] == {"query": "RAG", "max_results": 1, "days": 100}
+
+
+class SummaryModel:
+    def __init__(self, model):
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return AIMessage(content="summary")
+
+
+def test_collector_only_summarizes_new_articles(tmp_path, monkeypatch):
+    fixture = tmp_path / "news.json"
+    fixture.write_text(json.dumps([result(1, 2), result(2, 1)]))
+    monkeypatch.setenv("NEWS_SEARCH_FIXTURES", str(fixture))
+    monkeypatch.delenv("NEWS_STORE_DIR", raising=False)
+    router = LLMRouter(model_factory=SummaryModel)
+    set_router(router)
+    try:
+        from agents.news_collector import NewsCollectorAgent
+
+        agent = NewsCollectorAgent(str(tmp_path / "agent"))
+        store = agent.get_news_store({"data_dir": str(tmp_path / "run")})
+        first = asyncio.run(agent.search_news_for_tech("RAG", store))
+        fixture.write_text(json.dumps([result(1, 2), result(2, 1), result(3, 0)]))
+        second = asyncio.run(agent.search_news_for_tech("RAG", store))
+    finally:
+        set_router(None)
+
+    assert [a.title for a in first] == ["RAG news 2", "RAG news 1"]
+    assert [a.title for a in second] == ["RAG news 3", "RAG news 2", "RAG news 1"]
+    assert agent.async_client.calls[-1]["days"] == 1
+    assert store.store_dir == str(tmp_path / "run" / "news_store")
+    assert os.listdir(store.store_dir)
+    assert sum(model.calls for model in router.models.values()) == 3
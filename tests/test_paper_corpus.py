@@ -0,0 +1,70 @@
+from datetime import datetime
+from utils.paper_corpus import PaperCorpus
+
+
+def paper(paper_id, published):
+    return {
+        "id": paper_id,
+        "title": f"Paper {paper_id}",
+        "summary": "",
+        "published": published,
+    }
+
+
+def test_corpus_lives_in_the_data_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("PAPER_CORPUS_DIR", raising=False)
+    corpus = PaperCorpus(data_dir=str(tmp_path))
+    assert corpus.corpus_dir == str(tmp_path / "paper_corpus")
+
+
+def test_sync_point_is_newest_stored_paper(tmp_path):
+    corpus = PaperCorpus(str(tmp_path))
+    assert corpus.last_sync("AI") is None
+    corpus.merge(
+        "AI",
+        [
+            paper("1", "2024-01-01T00:00:00+00:00"),
+            paper("2", "2024-02-01T00:00:00+00:00"),
+        ],
+    )
+    assert corpus.last_sync("AI") == datetime.fromisoformat("2024-02-01T00:00:00+00:00")
+
+    # An empty or older fetch never moves the sync point back
+    corpus.merge("AI", [])
+    corpus.merge("AI", [paper("0", "2023-06-01T00:00:00+00:00")])
+    assert corpus.last_sync("AI") == datetime.fromisoformat("2024-02-01T00:00:00+00:00")
+
+
+def test_terms_age_out_with_old_papers(tmp_path):
+    corpus = PaperCorpus(str(tmp_path), term_papers=2, max_terms=3)
+    corpus.mark_summarized("AI", [paper("1", "2024-01-01")], ["old"])
+    corpus.mark_summarized("AI", [paper("2", "2024-02-01")], ["middle"])
+    terms = corpus.mark_summarized(
+        "AI", [paper("3", "2024-03-01")], ["new", "middle", "extra", "more"]
+    )
+    assert terms == ["new", "middle", "extra"]
+    summarized = corpus.summarized("AI")
+    assert summarized["terms"] == terms
+    assert summarized["ids"] == {"1", "2", "3"}
+
+
+def test_sync_point_is_floored_at_the_window_start(tmp_path):
+    corpus = PaperCorpus(str(tmp_path))
+    floor = datetime.fromisoformat("2023-01-01T00:00:00+00:00")
+    corpus.merge("AI", [paper("1", "2015-05-01T00:00:00+00:00")], floor=floor)
+    assert corpus.last_sync("AI") == floor
+    corpus.merge("AI", [paper("2", "2024-03-01T00:00:00+00:00")], floor=floor)
+    assert corpus.last_sync("AI") == datetime.fromisoformat("2024-03-01T00:00:00+00:00")
+
+
+def test_atomic_write_leaves_no_partial_file(tmp_path):
+    import json
+    import pytest
+    from utils.data_manager import write_json_atomic
+
+    path = tmp_path / "entry.json"
+    write_json_atomic(str(path), {"title": "논문"})
+    with pytest.raises(TypeError):
+        write_json_atomic(str(path), {"bad": object()})
+    assert json.loads(path.read_text(encoding="utf-8")) == {"title": "논문"}
+    assert [p.name for p in tmp_path.iterdir()] == ["entry.json"]
@@ -0,0 +1,94 @@
+import numpy as np
+
+from utils.retrieval import build_evidence_index, select_tech_passages
+
+
+def make_state():
+    return {
+        "collected_papers": {
+            "AI": [
+                {"title": "Reinforcement learning for robots", "summary": "Policy."},
+                {"title": "Transformers at scale", "summary": "Attention."},
+            ],
+            "LLVM": [
+                {"title": "Optimizing compiler passes", "summary": "IR rewrites."},
+            ],
+        },
+        "summarized_tech": {
+            "AI": ["reinforcement learning", "transformer"],
+            "LLVM": ["LLVM"],
+        },
+        "collected_news": {
+            "reinforcement learning": [
+                {"title": "Robots learn to walk", "summary": "Reward shaping."},
+                {"title": "Industry roundup", "summary": "Chips and models."},
+            ],
+            "transformer": [
+                {"title": "Transformer chips ship", "summary": "New accelerators."},
+                {"title": "Industry roundup", "summary": "Chips and models."},
+            ],
+            "LLVM": [
+                {"title": "Toolchain release notes", "summary": "Faster builds."},
+            ],
+        },
+    }
+
+
+def test_passages_come_only_from_own_sources():
+    state = make_state()
+    build_evidence_index(state)
+    for tech in ("reinforcement learning", "transformer", "LLVM"):
+        keywords = [k for k, techs in state["summarized_tech"].items() if tech in techs]
+        passages = select_tech_passages(state, tech)
+        assert passages
+        for passage in passages:
+            if passage["source"] == "news":
+                assert passage["key"] == tech
+            else:
+                assert passage["key"] in keywords
+
+
+def test_tech_without_query_overlap_still_gets_its_news():
+    state = make_state()
+    build_evidence_index(state)
+    titles = {p["title"] for p in select_tech_passages(state, "LLVM")}
+    assert titles == {"Toolchain release notes", "Optimizing compiler passes"}
+
+
+def test_shared_article_is_kept_for_each_technology():
+    state = make_state()
+    build_evidence_index(state)
+    for tech in ("reinforcement learning", "transformer"):
+        titles = [p["title"] for p in select_tech_passages(state, tech)]
+        assert "Industry roundup" in titles
+
+
+def test_top_passage_matches_the_technology():
+    state = make_state()
+    build_evidence_index(state)
+    (passage,) = select_tech_passages(state, "transformer", top_k=1)
+    assert "transformer" in passage["title"].lower()
+
+
+def test_sparse_scores_match_dense_cosine():
+    from utils.retrieval import RetrievalIndex, format_passage
+
+    passages = [
+        {"title": "Quantum error correction", "summary": "Surface codes."},
+        {"title": "Quantum sensing", "summary": "Quantum quantum magnetometers."},
+        {"title": "Battery chemistry", "summary": ""},
+    ]
+    index = RetrievalIndex(n_features=64).build(passages)
+
+    def dense(text):
+        vector = index._query_vector(text)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    query = "quantum codes"
+    expected = [float(dense(format_passage(p)) @ dense(query)) for p in passages]
+    scores = index._scores(np.arange(len(passages)), index._query_vector(query))
+    assert np.allclose(scores, expected, atol=1e-6)
+    assert [p["title"] for _, p in index.search(query)] == [
+        "Quantum error correction",
+        "Quantum sensing",
+    ]
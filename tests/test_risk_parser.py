@@ -0,0 +1,74 @@
+from utils.risk_parser import RiskAnalysisParser, parse_risk_analysis
+
+RESPONSE = """RISKS:
+1. Supply constraints
+- Description: Chip supply is short.
+- Impact: High
+2) **Regulation**
+- Description: New rules
+  may slow adoption.
+
+**OPPORTUNITIES:**
+**1.** Market growth
+- Description: Spending could reach
+3.5 billion dollars by 2027.
+- Impact: Medium
+"""
+
+
+def test_parses_sections_items_and_continuations():
+    result = parse_risk_analysis(RESPONSE)
+    assert [item["title"] for item in result["risks"]] == [
+        "Supply constraints",
+        "Regulation",
+    ]
+    assert result["risks"][1]["description"] == "New rules may slow adoption."
+    (growth,) = result["opportunities"]
+    assert growth == {
+        "title": "Market growth",
+        "description": "Spending could reach 3.5 billion dollars by 2027.",
+        "impact": "Medium",
+    }
+
+
+def test_chunk_boundaries_do_not_change_the_result():
+    expected = parse_risk_analysis(RESPONSE)
+    for size in (1, 3, 7, 64):
+        parser = RiskAnalysisParser()
+        completed = []
+        for start in range(0, len(RESPONSE), size):
+            completed.extend(parser.feed(RESPONSE[start : start + size]))
+        completed.extend(parser.close())
+        assert parser.result() == expected
+        assert [section for section, _ in completed] == [
+            "risks",
+            "risks",
+            "opportunities",
+        ]
+
+
+def test_items_are_emitted_once_the_next_one_starts():
+    parser = RiskAnalysisParser()
+    assert parser.feed("RISKS\n1. First\n- Impact: Low\n") == []
+    assert parser.feed("2. Second\n") == [
+        ("risks", {"title": "First", "impact": "Low"})
+    ]
+    assert parser.close() == [("risks", {"title": "Second"})]
+
+
+def test_malformed_lines_and_items_before_a_section_are_ignored():
+    result = parse_risk_analysis(
+        "Here is the analysis.\n"
+        "1. Orphan item\n"
+        "- Impact: High\n"
+        "RISKS\n"
+        "stray text before any item\n"
+        "- Impact: without an item\n"
+        "1. Real risk\n"
+        "- Impact High without a colon\n"
+        "- Impact: Low\n"
+    )
+    assert result == {
+        "risks": [{"title": "Real risk", "impact": "Low"}],
+        "opportunities": [],
+    }
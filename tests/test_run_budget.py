@@ -0,0 +1,76 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from utils.llm_router import LLMRouter
+from utils.run_budget import BudgetExhausted, RunBudget, use_budget
+
+
+class CountingModel:
+    def __init__(self, model):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return AIMessage(content="ok")
+
+
+def test_unbounded_budget_never_degrades():
+    budget = RunBudget()
+    terms = [f"tech {i}" for i in range(50)]
+    assert budget.limit_terms("trend_predictor", terms) == terms
+    assert not budget.exhausted("trend_predictor")
+    assert budget.degradations == []
+
+
+def test_caps_apply_under_pressure_and_are_listed_once():
+    budget = RunBudget(token_budget=100)
+    budget.tokens_used = 35
+    papers = list(range(12))
+    assert budget.limit_papers("tech_summarizer", papers) == papers[:5]
+    assert budget.limit_papers("tech_summarizer", papers) == papers[:5]
+    assert len(budget.limit_terms("trend_predictor", [str(i) for i in range(30)])) == 20
+    assert not budget.fast_risk_analysis("risk_analyzer")
+    assert len(budget.degradations) == 2
+
+    budget.tokens_used = 95
+    assert budget.fast_risk_analysis("risk_analyzer")
+    assert budget.skip_risk_analysis("risk_analyzer")
+
+
+def test_router_refuses_calls_once_budget_is_used_up():
+    router = LLMRouter(model_factory=CountingModel)
+    budget = RunBudget(token_budget=10)
+    messages = [HumanMessage(content="hello")]
+    with use_budget(budget):
+        assert router.invoke("trend_predictor.analyze_trend", messages).content == "ok"
+        budget.tokens_used = 10
+        with pytest.raises(BudgetExhausted):
+            router.invoke("trend_predictor.analyze_trend", messages)
+    assert sum(model.calls for model in router.models.values()) == 1
+    assert budget.degradations[-1].startswith("trend_predictor: remaining LLM calls")
+
+
+def test_degraded_output_is_not_reused_by_later_runs(tmp_path):
+    from agents.base_agent import BaseAgent
+
+    class ScoringAgent(BaseAgent):
+        def save_state(self, state, data):
+            if data is None:
+                return False
+            state["scores"] = data
+            return True
+
+        async def aexecute(self, state):
+            budget = state["run_budget"]
+            scores = {"tech": 0 if budget.exhausted(self.name) else 90}
+            state["scores"] = scores
+            return state, scores
+
+    agent = ScoringAgent("trend_predictor", str(tmp_path))
+    budget = RunBudget(token_budget=100)
+    budget.tokens_used = 100
+    assert agent.run({"run_budget": budget})["scores"] == {"tech": 0}
+    assert agent.data_manager.get_latest_agent_output("trend_predictor") is None
+
+    state = agent.run({"run_budget": RunBudget()})
+    assert state["scores"] == {"tech": 90}
+    assert agent.data_manager.get_latest_agent_output("trend_predictor") == {"tech": 90}
@@ -0,0 +1,210 @@
+import json
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, Hashable, List, Mapping, Tuple
+from utils.retrieval import (
+    estimate_tokens,
+    format_passage,
+    get_evidence_index,
+    load_retrieval_config,
+    select_tech_passages,
+)
+
+try:
+    import tiktoken
+except ImportError:  # Optional: fall back to the character-based estimate
+    tiktoken = None
+
+MAX_CACHED_PARTS = 4096
+TOKEN_ENCODING = "cl100k_base"
+
+_encoding = None
+_parts: "OrderedDict[str, Part]" = OrderedDict()
+
+
+def count_tokens(text: str) -> int:
+    """Tokens of a prompt part with the GPT-4 encoding, estimated without tiktoken"""
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+        except Exception:  # The encoding file could not be downloaded
+            _encoding = False
+    if not _encoding:
+        return estimate_tokens(text)
+    return len(_encoding.encode(text))
+
+
+@dataclass(frozen=True, slots=True)
+class Part:
+    """Rendered prompt text and its token count"""
+
+    text: str
+    tokens: int
+
+
+def cached_part(kind: str, inputs: Any, render: Callable[[], str]) -> Part:
+    """Render a part once per distinct input, shared by every run in the process"""
+    payload = json.dumps(
+        [kind, inputs], ensure_ascii=False, sort_keys=True, default=str
+    )
+    key = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    part = _parts.get(key)
+    if part is None:
+        text = render()
+        part = Part(text, count_tokens(text))
+        _parts[key] = part
+        if len(_parts) > MAX_CACHED_PARTS:
+            _parts.popitem(last=False)
+    else:
+        _parts.move_to_end(key)
+    return part
+
+
+def render_evidence(passages: List[Dict[str, Any]]) -> str:
+    return "\n\n".join(format_passage(p) for p in passages)
+
+
+def render_news_highlights(
+    passages: List[Dict[str, Any]], max_articles: int = 3
+) -> str:
+    highlights = []
+    for article in [p for p in passages if p["source"] == "news"][:max_articles]:
+        highlights.append(f"• {article['title']}")
+        highlights.append(f"  {article['summary'][:200]}...")
+        highlights.append("")
+    return "\n".join(highlights)
+
+
+def render_metrics(metrics: Mapping[str, Any]) -> str:
+    return "\n".join(
+        f"- {key}: {value}" for key, value in metrics.items() if key != "total_score"
+    )
+
+
+def render_metrics_summary(tech: str, metrics: Mapping[str, Any]) -> str:
+    return "\n".join(
+        [
+            f"{tech}:",
+            f"- Market Adoption: {metrics.get('market_adoption', 0)}",
+            f"- Research Activity: {metrics.get('research_activity', 0)}",
+            f"- Total Score: {metrics.get('total_score', 0)}",
+            "",
+        ]
+    )
+
+
+def render_risk_detail(analysis: Mapping[str, List[Dict[str, str]]]) -> str:
+    risk_text = []
+    for item in analysis.get("risks", []) + analysis.get("opportunities", []):
+        risk_text.append(f"• {item.get('title', '')}")
+        risk_text.append(f"  Impact: {item.get('impact', '')}")
+        risk_text.append(f"  {item.get('explanation', '')}")
+    return "\n".join(risk_text)
+
+
+def render_risk_summary(tech: str, analysis: Mapping[str, List[Dict[str, str]]]) -> str:
+    summary = [f"{tech}:"]
+    for key, heading in (
+        ("risks", "Critical Risks:"),
+        ("opportunities", "Key Opportunities:"),
+    ):
+        items = analysis.get(key, [])[:2]
+        if items:
+            summary.append(heading)
+            for item in items:
+                summary.append(
+                    f"- {item.get('title', '')}: {item.get('impact', '')} impact"
+                )
+    summary.append("")
+    return "\n".join(summary)
+
+
+# Renderer of each part kind, called with the technology and the part's inputs
+PART_RENDERERS: Dict[str, Callable[[str, Any], str]] = {
+    "evidence": lambda tech, passages: render_evidence(passages),
+    "news_highlights": lambda tech, passages: render_news_highlights(passages),
+    "metrics": lambda tech, metrics: render_metrics(metrics),
+    "metrics_summary": render_metrics_summary,
+    "risk_detail": lambda tech, analysis: render_risk_detail(analysis),
+    "risk_summary": render_risk_summary,
+}
+
+
+@dataclass(eq=False)
+class ContextBundle:
+    """Prompt-ready material of one technology, shared by the downstream agents
+
+    Parts are rendered lazily by kind. Each part remembers a cheap version of
+    its inputs, so it is looked up in the shared cache (which hashes the full
+    inputs) only when that version changed, e.g. when risk items arrived.
+    """
+
+    tech: str
+    passages: List[Dict[str, Any]]
+    state: Dict[str, Any] = field(repr=False)
+    index: Any = None
+    parts: Dict[str, Tuple[Hashable, Part]] = field(default_factory=dict)
+
+    def sources(self, kind: str) -> Tuple[Hashable, Any]:
+        """Cheap version of a part's inputs, and the inputs themselves"""
+        if kind in ("evidence", "news_highlights"):
+            # Passages are fixed for the bundle's evidence index
+            return None, self.passages
+        if kind in ("metrics", "metrics_summary"):
+            metrics = dict(self.state.get("trend_metrics", {}).get(self.tech, {}))
+            return tuple(metrics.items()), metrics
+        analysis = self.state.get("risk_opportunity_analysis", {}).get(self.tech, {})
+        # Items are only ever appended to a technology's analysis
+        version = (
+            id(analysis),
+            len(analysis.get("risks", [])),
+            len(analysis.get("opportunities", [])),
+        )
+        return version, analysis
+
+    def part(self, kind: str) -> Part:
+        version, inputs = self.sources(kind)
+        cached = self.parts.get(kind)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        part = cached_part(
+            kind, [self.tech, inputs], lambda: PART_RENDERERS[kind](self.tech, inputs)
+        )
+        self.parts[kind] = (version, part)
+        return part
+
+    def text(self, kind: str) -> str:
+        return self.part(kind).text
+
+    def tokens(self, *kinds: str) -> int:
+        """Tokens of the given parts, or of all parts"""
+        return sum(self.part(kind).tokens for kind in kinds or PART_RENDERERS)
+
+
+def get_context_bundle(state: Dict[str, Any], tech: str) -> ContextBundle:
+    """Bundle of a technology, memoized in the state for the whole run
+
+    Evidence passages are selected once per evidence index; parts are only
+    rendered when first asked for and re-rendered when their inputs changed.
+    """
+    bundles = state.setdefault("context_bundles", {})
+    index = get_evidence_index(state)
+    bundle = bundles.get(tech)
+    if bundle is None or bundle.index is not index:
+        passages = select_tech_passages(state, tech, **load_retrieval_config())
+        bundle = ContextBundle(tech, passages, state, index)
+        bundles[tech] = bundle
+    return bundle
+
+
+def format_context_tokens(bundles: List[ContextBundle], *kinds: str) -> str:
+    """One-line size report of the prompt material about to be sent"""
+    sizes = [bundle.tokens(*kinds) for bundle in bundles]
+    if not sizes:
+        return "Prompt context: no technologies"
+    return (
+        f"Prompt context: {sum(sizes)} tokens across {len(sizes)} technologies "
+        f"(largest {max(sizes)}, {', '.join(kinds) or 'all parts'})"
+    )
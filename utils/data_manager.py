@@ -1,7 +1,25 @@
 import json
 import os
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
+from models.records import to_serializable
+
+
+def write_json_atomic(path: str, data: Any, **kwargs) -> None:
+    """Write JSON through a temporary file so readers never see a partial file
+
+    Extra keyword arguments are passed to json.dump.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, **kwargs)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
 
 class DataManager:
@@ -20,8 +38,7 @@ class DataManager:
 
         output = {"timestamp": timestamp, "data": data}
 
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(output, f, ensure_ascii=False, indent=2)
+        write_json_atomic(filepath, output, indent=2, default=to_serializable)
 
         return filepath
 
@@ -0,0 +1,173 @@
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Dict, Any, Awaitable, Callable, Iterable, Optional
+import numpy as np
+
+DEFAULT_TIMEOUT = 120.0
+DEFAULT_HEDGE_PERCENTILE = 95.0
+DEFAULT_MIN_SAMPLES = 20
+DEFAULT_WINDOW = 500
+
+
+class LatencyStats:
+    """Recent latencies and timeout/hedge counters per call name
+
+    Names are "<agent>.<call>"; reports group them by agent.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.calls: Dict[str, Dict[str, Any]] = {}
+
+    def entry(self, name: str) -> Dict[str, Any]:
+        if name not in self.calls:
+            self.calls[name] = {
+                "calls": 0,
+                "errors": 0,
+                "timeouts": 0,
+                "hedged": 0,
+                "hedge_wins": 0,
+                "latencies": deque(maxlen=self.window),
+            }
+        return self.calls[name]
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        latencies = self.calls.get(name, {}).get("latencies")
+        if not latencies:
+            return None
+        return float(np.percentile(latencies, q))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Calls, timeouts, hedge rate and p50/p95/p99 latency per agent"""
+        agents: Dict[str, list] = {}
+        for name in self.calls:
+            agents.setdefault(name.split(".", 1)[0], []).append(self.calls[name])
+        return {agent: self.merge(entries) for agent, entries in sorted(agents.items())}
+
+    @staticmethod
+    def merge(entries: Iterable[Dict[str, Any]]) -> Dict[str, float]:
+        entries = list(entries)
+        latencies = [latency for e in entries for latency in e["latencies"]]
+        totals = {
+            key: sum(e[key] for e in entries)
+            for key in ("calls", "errors", "timeouts", "hedged", "hedge_wins")
+        }
+        totals["hedge_rate"] = round(totals["hedged"] / max(totals["calls"], 1), 4)
+        for q in (50, 95, 99):
+            totals[f"p{q}"] = (
+                round(float(np.percentile(latencies, q)), 3) if latencies else None
+            )
+        return totals
+
+    def format(self) -> str:
+        """Human-readable per-agent latency report"""
+        lines = ["Call latency by agent:"]
+        for agent, stats in self.summary().items():
+            percentiles = ", ".join(
+                f"p{q} {stats[f'p{q}']:.2f}s"
+                for q in (50, 95, 99)
+                if stats[f"p{q}"] is not None
+            )
+            lines.append(
+                f"- {agent}: {stats['calls']} calls, {stats['errors']} errors, "
+                f"{stats['timeouts']} timeouts, {stats['hedged']} hedged "
+                f"({stats['hedge_rate']:.1%}, {stats['hedge_wins']} won)"
+                + (f", {percentiles}" if percentiles else "")
+            )
+        return "\n".join(lines)
+
+
+# Process-wide statistics shared by the LLM router and the news search
+latency_stats = LatencyStats()
+
+
+class HedgedCaller:
+    """Bounds async calls with a timeout and optionally hedges slow ones
+
+    When hedging is on and a call name has enough history, a call still
+    running after that name's percentile latency (p95 by default) gets a
+    duplicate; whichever attempt succeeds first wins and the other is
+    cancelled and awaited. The timeout covers the whole call, hedge included.
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        hedge: bool = False,
+        hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        stats: Optional[LatencyStats] = None,
+    ):
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.stats = stats or latency_stats
+
+    @classmethod
+    def from_env(cls, prefix: str, timeout: float = DEFAULT_TIMEOUT) -> "HedgedCaller":
+        """Read <prefix>_TIMEOUT_SECONDS, <prefix>_HEDGE and <prefix>_HEDGE_PERCENTILE"""
+        return cls(
+            timeout=float(os.getenv(f"{prefix}_TIMEOUT_SECONDS", timeout)),
+            hedge=os.getenv(f"{prefix}_HEDGE", "").lower() in ("1", "true", "yes"),
+            hedge_percentile=float(
+                os.getenv(f"{prefix}_HEDGE_PERCENTILE", DEFAULT_HEDGE_PERCENTILE)
+            ),
+        )
+
+    def hedge_delay(self, name: str) -> Optional[float]:
+        """Seconds to wait before hedging a call, or None to not hedge it"""
+        entry = self.stats.entry(name)
+        if not self.hedge or len(entry["latencies"]) < self.min_samples:
+            return None
+        return self.stats.percentile(name, self.hedge_percentile)
+
+    async def call(self, name: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self.stats.entry(name)
+        entry["calls"] += 1
+        start_time = time.monotonic()
+        deadline = start_time + self.timeout
+        hedge_delay = self.hedge_delay(name)
+
+        primary = asyncio.ensure_future(func())
+        attempts = [primary]
+        try:
+            while True:
+                now = time.monotonic()
+                wait_for = deadline - now
+                if hedge_delay is not None and len(attempts) == 1:
+                    wait_for = min(wait_for, start_time + hedge_delay - now)
+                done, pending = await asyncio.wait(
+                    attempts,
+                    timeout=max(wait_for, 0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                for attempt in done:
+                    if not attempt.cancelled() and attempt.exception() is None:
+                        entry["latencies"].append(time.monotonic() - start_time)
+                        if attempt is not primary:
+                            entry["hedge_wins"] += 1
+                        return attempt.result()
+                if done and not pending:
+                    # Every attempt failed; surface the primary's error if it has one
+                    failed = primary if primary.done() else next(iter(done))
+                    entry["errors"] += 1
+                    raise failed.exception()
+                attempts = list(pending)
+
+                if time.monotonic() >= deadline:
+                    entry["timeouts"] += 1
+                    raise asyncio.TimeoutError(
+                        f"{name} did not finish within {self.timeout:g}s"
+                    )
+                if hedge_delay is not None and len(attempts) == 1 and not done:
+                    attempts.append(asyncio.ensure_future(func()))
+                    entry["hedged"] += 1
+                    hedge_delay = None
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
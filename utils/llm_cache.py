@@ -0,0 +1,86 @@
+import os
+import json
+import time
+import hashlib
+import asyncio
+from typing import Any, List, Optional
+from filelock import FileLock, Timeout
+from utils.data_manager import write_json_atomic
+
+# Scores and summaries go stale as the field moves; re-ask after a week
+DEFAULT_TTL = 7 * 24 * 3600.0
+
+
+def message_key(model: str, messages: List[Any]) -> str:
+    """Stable hash of a model name and its prompt messages"""
+    payload = json.dumps(
+        [model, [(m.type, m.content) for m in messages]], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """On-disk cache of LLM responses shared between processes
+
+    Each entry is one JSON file keyed by a hash of the model and messages.
+    A per-key file lock is held while the response is computed, so when
+    several processes need the same prompt only one of them calls the model.
+    Entries older than ttl seconds, or written under another epoch, are
+    misses; bump the epoch to invalidate everything after a prompt or model
+    change.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        ttl: Optional[float] = DEFAULT_TTL,
+        epoch: str = "",
+        poll_interval: float = 0.05,
+    ):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.epoch = epoch
+        self.poll_interval = poll_interval
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_env(cls, cache_dir: str) -> "LLMCache":
+        """Read LLM_CACHE_TTL_SECONDS (0 keeps entries forever) and LLM_CACHE_EPOCH"""
+        ttl = float(os.getenv("LLM_CACHE_TTL_SECONDS", DEFAULT_TTL))
+        return cls(cache_dir, ttl=ttl or None, epoch=os.getenv("LLM_CACHE_EPOCH", ""))
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def lock(self, key: str) -> FileLock:
+        os.makedirs(os.path.dirname(self.path(key)), exist_ok=True)
+        return FileLock(f"{self.path(key)}.lock", thread_local=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response content, or None on a miss"""
+        try:
+            with open(self.path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if entry.get("epoch", "") != self.epoch:
+            return None
+        if self.ttl is not None and time.time() - entry.get("created_at", 0) > self.ttl:
+            return None
+        return entry.get("content")
+
+    def set(self, key: str, content: str) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_json_atomic(
+            path, {"content": content, "created_at": time.time(), "epoch": self.epoch}
+        )
+
+    async def acquire(self, lock: FileLock) -> None:
+        """Wait for a lock without blocking the event loop"""
+        while True:
+            try:
+                lock.acquire(timeout=0)
+                return
+            except Timeout:
+                await asyncio.sleep(self.poll_interval)
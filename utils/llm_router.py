@@ -0,0 +1,472 @@
+import os
+import math
+import time
+import asyncio
+import threading
+import weakref
+from contextlib import aclosing
+from typing import Dict, Any, AsyncIterator, List, Callable, Optional
+from langchain_core.messages import AIMessage
+from utils.llm_cache import LLMCache, message_key
+from utils.hedging import DEFAULT_TIMEOUT, HedgedCaller
+from utils.single_flight import SingleFlight
+from utils.run_budget import BudgetExhausted, check_budget
+
+DEFAULT_MODEL = "gpt-4"
+DEFAULT_MAX_CONCURRENCY = 8
+
+# High-volume, low-difficulty tasks start on a fast model
+DEFAULT_ROUTES = {
+    "default": DEFAULT_MODEL,
+    "news_collector.summarize_article": "gpt-4o-mini",
+    "trend_predictor.analyze_trend": "gpt-4o-mini",
+    # Used instead of risk_analyzer.analyze_risks under budget pressure
+    "risk_analyzer.analyze_risks_fast": "gpt-4o-mini",
+}
+
+# Model to re-run on when a response fails validation or is not confident
+DEFAULT_ESCALATION = {
+    "gpt-4o-mini": DEFAULT_MODEL,
+}
+
+
+def parse_mapping(spec: Optional[str]) -> Dict[str, str]:
+    """Parse a "key=value,key=value" string into a mapping"""
+    mapping = {}
+    if not spec:
+        return mapping
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        key, value = item.split("=", 1)
+        mapping[key.strip()] = value.strip()
+    return mapping
+
+
+def default_model_factory(model: str) -> Any:
+    """Create an OpenAI chat model for the given model name
+
+    Token log probabilities are requested when LLM_MIN_CONFIDENCE is set,
+    so the router can measure how confident a response is.
+    """
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model=model,
+        timeout=float(os.getenv("LLM_TIMEOUT_SECONDS", DEFAULT_TIMEOUT)),
+        logprobs=bool(os.getenv("LLM_MIN_CONFIDENCE")),
+    )
+
+
+def response_confidence(response: Any) -> Optional[float]:
+    """Geometric mean token probability of a response, None without logprobs"""
+    metadata = getattr(response, "response_metadata", None) or {}
+    tokens = (metadata.get("logprobs") or {}).get("content") or []
+    logprobs = [token["logprob"] for token in tokens if "logprob" in token]
+    if not logprobs:
+        return None
+    return math.exp(sum(logprobs) / len(logprobs))
+
+
+class LLMRouter:
+    """Routes agent tasks to models and escalates on failed validation
+
+    Tasks are named "<agent>.<task>". A route is looked up for the full task
+    name, then the agent name, then "default". A response is escalated to the
+    next model when it fails validation, when the call raises, or when
+    min_confidence is set and the response's token probabilities fall below
+    it. Any chat-model-like object with an ``invoke`` method can be used as a
+    backend through ``model_factory``, e.g. langchain's ``FakeListChatModel``
+    for tests.
+    """
+
+    def __init__(
+        self,
+        routes: Optional[Dict[str, str]] = None,
+        escalation: Optional[Dict[str, str]] = None,
+        model_factory: Callable[[str], Any] = default_model_factory,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        cache: Optional[LLMCache] = None,
+        hedger: Optional[HedgedCaller] = None,
+        min_confidence: Optional[float] = None,
+    ):
+        self.routes = dict(DEFAULT_ROUTES if routes is None else routes)
+        self.routes.setdefault("default", DEFAULT_MODEL)
+        self.escalation = dict(DEFAULT_ESCALATION if escalation is None else escalation)
+        self.model_factory = model_factory
+        self.models: Dict[str, Any] = {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+        self.max_concurrency = max_concurrency
+        self.min_confidence = min_confidence
+        self.cache = cache
+        self.single_flight = SingleFlight()
+        # Async calls are bounded by a timeout and optionally hedged, per task
+        self.hedger = hedger or HedgedCaller()
+        self._lock = threading.Lock()
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "LLMRouter":
+        """Create a router with LLM_ROUTES / LLM_ESCALATION overrides applied"""
+        routes = dict(DEFAULT_ROUTES)
+        routes.update(parse_mapping(os.getenv("LLM_ROUTES")))
+        escalation = dict(DEFAULT_ESCALATION)
+        escalation.update(parse_mapping(os.getenv("LLM_ESCALATION")))
+        kwargs.setdefault(
+            "max_concurrency",
+            int(os.getenv("LLM_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)),
+        )
+        if os.getenv("LLM_CACHE_DIR"):
+            kwargs.setdefault("cache", LLMCache.from_env(os.getenv("LLM_CACHE_DIR")))
+        kwargs.setdefault("hedger", HedgedCaller.from_env("LLM"))
+        if os.getenv("LLM_MIN_CONFIDENCE"):
+            kwargs.setdefault("min_confidence", float(os.getenv("LLM_MIN_CONFIDENCE")))
+        return cls(routes=routes, escalation=escalation, **kwargs)
+
+    def model_for(self, task: str) -> str:
+        """Model name assigned to a task"""
+        if task in self.routes:
+            return self.routes[task]
+        agent = task.split(".", 1)[0]
+        return self.routes.get(agent, self.routes["default"])
+
+    def get_model(self, model: str) -> Any:
+        """Return the (cached) client for a model name"""
+        with self._lock:
+            if model not in self.models:
+                self.models[model] = self.model_factory(model)
+            return self.models[model]
+
+    def record(
+        self, model: str, latency: float, calls: int = 1, **counters: int
+    ) -> None:
+        """Add a call and its latency to the per-model statistics"""
+        with self._lock:
+            stats = self.stats.setdefault(
+                model,
+                {
+                    "calls": 0,
+                    "errors": 0,
+                    "escalations": 0,
+                    "cache_hits": 0,
+                    "total_latency": 0.0,
+                },
+            )
+            stats["calls"] += calls
+            stats["total_latency"] += latency
+            for key, value in counters.items():
+                stats[key] += value
+
+    def is_valid(
+        self, response: Any, validate: Optional[Callable[[Any], bool]]
+    ) -> bool:
+        """Run a response validator, treating validator errors as failures"""
+        if validate is None:
+            return True
+        try:
+            return bool(validate(response))
+        except Exception:
+            return False
+
+    def is_confident(self, response: Any) -> bool:
+        """Whether a response meets min_confidence (always, without logprobs)"""
+        if self.min_confidence is None:
+            return True
+        confidence = response_confidence(response)
+        return confidence is None or confidence >= self.min_confidence
+
+    def escalation_reason(
+        self, response: Any, validate: Optional[Callable[[Any], bool]]
+    ) -> Optional[str]:
+        """Why a response should go to the next model, or None to accept it"""
+        if not self.is_valid(response, validate):
+            return "failed validation"
+        if not self.is_confident(response):
+            return f"confidence {response_confidence(response):.2f}"
+        return None
+
+    def cache_response(
+        self, key: str, response: Any, validate: Optional[Callable[[Any], bool]]
+    ) -> None:
+        """Cache a response unless it would have been escalated
+
+        The last model's response is returned even when it fails validation,
+        but it must not be served from the cache to later runs.
+        """
+        if self.escalation_reason(response, validate) is None:
+            self.cache.set(key, response.content)
+
+    def invoke(
+        self,
+        task: str,
+        messages: List[Any],
+        validate: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Invoke the task's model, escalating while validation fails"""
+        if self.cache is None:
+            return self._invoke(task, messages, validate)
+
+        model = self.model_for(task)
+        key = message_key(model, messages)
+        with self.cache.lock(key):
+            content = self.cache.get(key)
+            if content is not None:
+                self.record(model, 0.0, calls=0, cache_hits=1)
+                return AIMessage(content=content)
+            response = self._invoke(task, messages, validate)
+            self.cache_response(key, response, validate)
+            return response
+
+    def _invoke(
+        self,
+        task: str,
+        messages: List[Any],
+        validate: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        model = self.model_for(task)
+        tried = set()
+        while True:
+            tried.add(model)
+            next_model = self.escalation.get(model)
+            if next_model in tried:
+                next_model = None
+            check_budget(task)
+            start_time = time.time()
+            try:
+                response = self.get_model(model).invoke(messages)
+            except Exception:
+                self.record(model, time.time() - start_time, errors=1)
+                if next_model is None:
+                    raise
+                model = next_model
+                continue
+
+            reason = None
+            if next_model is not None:
+                reason = self.escalation_reason(response, validate)
+            if reason is None:
+                self.record(model, time.time() - start_time)
+                return response
+
+            print(f"Escalating {task} from {model} to {next_model} ({reason})")
+            self.record(model, time.time() - start_time, escalations=1)
+            model = next_model
+
+    def semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit for async calls on the running event loop"""
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphores[loop]
+
+    async def ainvoke(
+        self,
+        task: str,
+        messages: List[Any],
+        validate: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Async counterpart of invoke, limited to max_concurrency calls at once
+
+        Identical requests in flight at the same time share a single call.
+        Each model call is bounded by LLM_TIMEOUT_SECONDS and hedged after the
+        task's p95 latency when LLM_HEDGE is set.
+        """
+        key = message_key(self.model_for(task), messages)
+        return await self.single_flight.do(
+            (task, key), lambda: self._acached(task, key, messages, validate)
+        )
+
+    async def _acached(
+        self,
+        task: str,
+        key: str,
+        messages: List[Any],
+        validate: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        if self.cache is None:
+            return await self._ainvoke(task, messages, validate)
+
+        model = self.model_for(task)
+        lock = self.cache.lock(key)
+        await self.cache.acquire(lock)
+        try:
+            content = self.cache.get(key)
+            if content is not None:
+                self.record(model, 0.0, calls=0, cache_hits=1)
+                return AIMessage(content=content)
+            response = await self._ainvoke(task, messages, validate)
+            self.cache_response(key, response, validate)
+            return response
+        finally:
+            lock.release()
+
+    async def _ainvoke(
+        self,
+        task: str,
+        messages: List[Any],
+        validate: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        model = self.model_for(task)
+        tried = set()
+        while True:
+            tried.add(model)
+            next_model = self.escalation.get(model)
+            if next_model in tried:
+                next_model = None
+            start_time = time.time()
+            client = self.get_model(model)
+            try:
+                async with self.semaphore():
+                    # Checked once a slot is free, as queued calls may wait long
+                    check_budget(task)
+                    response = await self.hedger.call(
+                        task, lambda: client.ainvoke(messages)
+                    )
+            except BudgetExhausted:
+                raise
+            except Exception:
+                self.record(model, time.time() - start_time, errors=1)
+                if next_model is None:
+                    raise
+                model = next_model
+                continue
+
+            reason = None
+            if next_model is not None:
+                reason = self.escalation_reason(response, validate)
+            if reason is None:
+                self.record(model, time.time() - start_time)
+                return response
+
+            print(f"Escalating {task} from {model} to {next_model} ({reason})")
+            self.record(model, time.time() - start_time, escalations=1)
+            model = next_model
+
+    async def astream(
+        self,
+        task: str,
+        messages: List[Any],
+        validate: Optional[Callable[[Any], bool]] = None,
+    ) -> AsyncIterator[str]:
+        """Stream the task's model response as text chunks
+
+        Identical streams in flight at the same time share one model call:
+        the first caller streams, the others get the complete text as one
+        chunk. Like ainvoke, the cache entry is locked while the response is
+        produced, a cached response comes back as one chunk, and a streamed
+        one is cached only if it passes validation. Every chunk must arrive
+        within the call timeout. Streams are not escalated or hedged:
+        callers that find the result unusable fall back to ainvoke.
+        """
+        model = self.model_for(task)
+        key = message_key(model, messages)
+        # Streams are keyed apart from ainvoke calls, whose results are
+        # validated and escalated while a stream's are not
+        flight_key = ("stream", task, key)
+        flight = self.single_flight.join(flight_key)
+        if flight is not None:
+            response = await asyncio.shield(flight)
+            yield response.content
+            return
+
+        future = self.single_flight.lead(flight_key)
+        lock = None
+        try:
+            if self.cache is not None:
+                lock = self.cache.lock(key)
+                await self.cache.acquire(lock)
+                content = self.cache.get(key)
+                if content is not None:
+                    self.record(model, 0.0, calls=0, cache_hits=1)
+                    future.set_result(AIMessage(content=content))
+                    yield content
+                    return
+
+            chunks = []
+            async with aclosing(self._astream(task, model, messages)) as stream:
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    yield chunk
+            response = AIMessage(content="".join(chunks))
+            if self.cache is not None:
+                self.cache_response(key, response, validate)
+            future.set_result(response)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            raise
+        finally:
+            # The caller stopped consuming the stream early
+            if not future.done():
+                future.cancel()
+            if lock is not None:
+                lock.release()
+
+    async def _astream(
+        self, task: str, model: str, messages: List[Any]
+    ) -> AsyncIterator[str]:
+        entry = self.hedger.stats.entry(task)
+        entry["calls"] += 1
+        client = self.get_model(model)
+        start_time = time.time()
+        deadline = start_time + self.hedger.timeout
+        async with self.semaphore():
+            check_budget(task)
+            stream = client.astream(messages).__aiter__()
+            try:
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(
+                            stream.__anext__(), deadline - time.time()
+                        )
+                    except StopAsyncIteration:
+                        break
+                    yield chunk.content
+            except asyncio.TimeoutError:
+                entry["timeouts"] += 1
+                self.record(model, time.time() - start_time, errors=1)
+                raise
+            except Exception:
+                entry["errors"] += 1
+                self.record(model, time.time() - start_time, errors=1)
+                raise
+            finally:
+                if hasattr(stream, "aclose"):
+                    await stream.aclose()
+
+        latency = time.time() - start_time
+        entry["latencies"].append(latency)
+        self.record(model, latency)
+
+    def format_stats(self) -> str:
+        """Human-readable per-model call and latency report"""
+        lines = ["LLM usage by model:"]
+        for model, stats in sorted(self.stats.items()):
+            mean = stats["total_latency"] / max(stats["calls"], 1)
+            lines.append(
+                f"- {model}: {stats['calls']} calls, {stats['errors']} errors, "
+                f"{stats['escalations']} escalations, {stats['cache_hits']} cache hits, "
+                f"{stats['total_latency']:.2f}s total, {mean:.2f}s mean"
+            )
+        lines.append(
+            f"Coalesced requests: {self.single_flight.coalesced} "
+            f"of {self.single_flight.started + self.single_flight.coalesced}"
+        )
+        return "\n".join(lines)
+
+
+_default_router: Optional[LLMRouter] = None
+
+
+def get_router() -> LLMRouter:
+    """Process-wide router shared by all agents"""
+    global _default_router
+    if _default_router is None:
+        _default_router = LLMRouter.from_env()
+    return _default_router
+
+
+def set_router(router: LLMRouter) -> None:
+    """Replace the shared router, e.g. with one backed by fake models"""
+    global _default_router
+    _default_router = router
@@ -0,0 +1,49 @@
+import re
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Any, List
+from utils.news_store import parse_published
+
+QUERY_STOPWORDS = {"technology", "news"}
+
+
+class LocalSearchClient:
+    """Offline stand-in for AsyncTavilyClient serving articles from a JSON file
+
+    The fixture is a list of Tavily-style results (title, url, content,
+    raw_content, published_date). A result matches when its title or content
+    contains every query term, and only results published within the last
+    `days` are returned, so incremental fetches can be exercised without
+    network access.
+    """
+
+    def __init__(self, fixture_path: str):
+        self.fixture_path = fixture_path
+        self.calls: List[Dict[str, Any]] = []
+
+    def load(self) -> List[Dict[str, Any]]:
+        # Re-read on every call so tests can add articles between runs
+        with open(self.fixture_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    async def search(
+        self, query: str, max_results: int = 5, days: int = 3, **kwargs
+    ) -> Dict[str, Any]:
+        self.calls.append({"query": query, "max_results": max_results, "days": days})
+        terms = [
+            term
+            for term in re.findall(r"\w+", query.lower())
+            if term not in QUERY_STOPWORDS
+        ]
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+
+        results = []
+        for result in self.load():
+            text = f"{result['title']} {result.get('content', '')}".lower()
+            published = parse_published(result.get("published_date"))
+            if all(term in text for term in terms) and (published or "") >= cutoff:
+                results.append(result)
+        results.sort(
+            key=lambda r: parse_published(r.get("published_date")), reverse=True
+        )
+        return {"query": query, "results": results[:max_results]}
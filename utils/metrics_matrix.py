@@ -0,0 +1,172 @@
+import os
+from typing import Dict, Any, List, Iterator, Mapping, Optional, Sequence
+import numpy as np
+
+METRIC_KEYS = [
+    "market_adoption",
+    "research_activity",
+    "investment_interest",
+    "media_coverage",
+    "future_potential",
+]
+
+DEFAULT_SCORE_THRESHOLD = 85.0
+
+
+def parse_weights(spec: Optional[str]) -> Dict[str, float]:
+    """Parse a "metric=weight,metric=weight" string into a weight mapping"""
+    weights = {}
+    if not spec:
+        return weights
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        key, value = item.split("=", 1)
+        key = key.strip()
+        if key not in METRIC_KEYS:
+            raise ValueError(f"Unknown trend metric in weights: {key}")
+        weights[key] = float(value)
+    return weights
+
+
+def load_selection_config() -> Dict[str, Any]:
+    """Read weighting and selection settings from the environment
+
+    Technologies are selected by score threshold or by top-K: setting
+    TREND_TOP_K turns the default threshold off. Only when both are set
+    explicitly does the top-K apply to the technologies above the threshold.
+    """
+    top_k = os.getenv("TREND_TOP_K")
+    threshold = os.getenv("TREND_SCORE_THRESHOLD")
+    if threshold:
+        threshold = float(threshold)
+    elif top_k:
+        threshold = None
+    else:
+        threshold = DEFAULT_SCORE_THRESHOLD
+    return {
+        "weights": parse_weights(os.getenv("TREND_METRIC_WEIGHTS")),
+        "threshold": threshold,
+        "top_k": int(top_k) if top_k else None,
+    }
+
+
+class MetricsMatrix:
+    """Trend metrics of all technologies stored as one (techs x metrics) array"""
+
+    def __init__(
+        self,
+        techs: Sequence[str],
+        values: Any,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        self.techs = list(techs)
+        self.index = {tech: i for i, tech in enumerate(self.techs)}
+        self.values = np.asarray(values, dtype=np.float32).reshape(
+            len(self.techs), len(METRIC_KEYS)
+        )
+        self.set_weights(weights)
+
+    @classmethod
+    def from_trend_metrics(
+        cls,
+        trend_metrics: Dict[str, Dict[str, float]],
+        weights: Optional[Dict[str, float]] = None,
+    ) -> "MetricsMatrix":
+        """Build the matrix from the per-technology metric dicts"""
+        techs = list(trend_metrics.keys())
+        values = [
+            [float(trend_metrics[tech].get(key, 0) or 0) for key in METRIC_KEYS]
+            for tech in techs
+        ]
+        return cls(techs, values, weights)
+
+    def set_weights(self, weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Apply per-metric weights and recompute every total score at once"""
+        vector = np.ones(len(METRIC_KEYS), dtype=np.float32)
+        for key, value in (weights or {}).items():
+            if value < 0:
+                raise ValueError(f"Trend metric weight must not be negative: {key}")
+            vector[METRIC_KEYS.index(key)] = value
+        if vector.sum() <= 0:
+            raise ValueError("Trend metric weights must sum to a positive value")
+        self.weights = vector / vector.sum()
+        self.total_scores = np.rint(self.values @ self.weights)
+        return self.total_scores
+
+    def select(
+        self, threshold: Optional[float] = None, top_k: Optional[int] = None
+    ) -> np.ndarray:
+        """Return indices of selected technologies, highest total score first"""
+        candidates = np.arange(len(self.techs))
+        if threshold is not None:
+            candidates = candidates[self.total_scores >= threshold]
+
+        scores = self.total_scores[candidates]
+        if top_k is not None and top_k < len(candidates):
+            if top_k <= 0:
+                return candidates[:0]
+            part = np.argpartition(-scores, top_k - 1)[:top_k]
+            candidates, scores = candidates[part], scores[part]
+
+        # Stable sort keeps the original order for equal scores
+        return candidates[np.argsort(-scores, kind="stable")]
+
+    def row(self, i: int) -> Dict[str, int]:
+        """Metrics of the i-th technology in the agents' dict form"""
+        metrics = {key: int(value) for key, value in zip(METRIC_KEYS, self.values[i])}
+        metrics["total_score"] = int(self.total_scores[i])
+        return metrics
+
+    def to_trend_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Convert back to the per-technology dict form stored by the agents"""
+        return {tech: self.row(i) for i, tech in enumerate(self.techs)}
+
+
+class MetricsView(Mapping):
+    """Read-only trend_metrics mapping backed by a MetricsMatrix
+
+    Rows are materialized as dicts only when accessed, so the state does not
+    hold one dict per technology.
+    """
+
+    def __init__(self, matrix: MetricsMatrix):
+        self.matrix = matrix
+
+    def __getitem__(self, tech: str) -> Dict[str, int]:
+        return self.matrix.row(self.matrix.index[tech])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.matrix.techs)
+
+    def __len__(self) -> int:
+        return len(self.matrix.techs)
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        return self.matrix.to_trend_metrics()
+
+
+def apply_metrics_selection(state: Dict[str, Any]) -> List[str]:
+    """Build the metrics matrix for the state and store the selected technologies"""
+    config = load_selection_config()
+    matrix = MetricsMatrix.from_trend_metrics(
+        state.get("trend_metrics", {}), config["weights"]
+    )
+
+    # Recomputed scores replace whatever total the LLM reported
+    if isinstance(state.get("trend_metrics"), dict):
+        for tech, score in zip(matrix.techs, matrix.total_scores):
+            state["trend_metrics"][tech]["total_score"] = int(score)
+
+    selected = matrix.select(config["threshold"], config["top_k"])
+    state["metrics_matrix"] = matrix
+    state["trend_metrics"] = MetricsView(matrix)
+    state["selected_techs"] = [matrix.techs[i] for i in selected]
+    return state["selected_techs"]
+
+
+def get_selected_techs(state: Dict[str, Any]) -> List[str]:
+    """Selected technologies of the state, building the matrix if needed"""
+    if "selected_techs" not in state:
+        return apply_metrics_selection(state)
+    return state["selected_techs"]
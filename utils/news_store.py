@@ -0,0 +1,122 @@
+import os
+import json
+import hashlib
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, List, Optional
+from filelock import FileLock
+from utils.data_manager import write_json_atomic
+
+DEFAULT_MAX_ARTICLES = 10
+DEFAULT_MAX_AGE_DAYS = 365 * 3
+
+
+def parse_published(value: Optional[str]) -> Optional[str]:
+    """Normalize a Tavily published date (RFC 2822 or ISO) to local ISO time"""
+    if not value:
+        return None
+    try:
+        published = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            published = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if published.tzinfo is not None:
+        published = published.astimezone().replace(tzinfo=None)
+    return published.isoformat(timespec="seconds")
+
+
+class NewsStore:
+    """Per-technology news history keyed by article URL
+
+    Each technology is one JSON file guarded by a file lock. It holds the
+    time of the last successful fetch and the summarized articles retained
+    so far, bounded by a maximum count and age.
+    """
+
+    def __init__(
+        self,
+        store_dir: Optional[str] = None,
+        max_articles: Optional[int] = None,
+        max_age_days: Optional[int] = None,
+        data_dir: str = "./data",
+    ):
+        self.store_dir = (
+            store_dir
+            or os.getenv("NEWS_STORE_DIR")
+            or os.path.join(data_dir, "news_store")
+        )
+        self.max_articles = max_articles or int(
+            os.getenv("NEWS_STORE_MAX_ARTICLES", DEFAULT_MAX_ARTICLES)
+        )
+        self.max_age_days = max_age_days or int(
+            os.getenv("NEWS_STORE_MAX_AGE_DAYS", DEFAULT_MAX_AGE_DAYS)
+        )
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def path(self, tech: str) -> str:
+        digest = hashlib.sha1(tech.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.store_dir, f"{digest}.json")
+
+    def lock(self, tech: str) -> FileLock:
+        return FileLock(f"{self.path(tech)}.lock", thread_local=False)
+
+    def load(self, tech: str) -> Dict[str, Any]:
+        try:
+            with open(self.path(tech), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"tech": tech, "last_fetch": None, "articles": {}}
+
+    def read(self, tech: str) -> Dict[str, Any]:
+        """Load a technology's history under its lock, never mid-merge"""
+        with self.lock(tech):
+            return self.load(tech)
+
+    def save(self, tech: str, entry: Dict[str, Any]) -> None:
+        write_json_atomic(self.path(tech), entry)
+
+    def last_fetch(self, tech: str) -> Optional[datetime]:
+        """Time of the last successful fetch for a technology, or None"""
+        last_fetch = self.read(tech)["last_fetch"]
+        return datetime.fromisoformat(last_fetch) if last_fetch else None
+
+    def window_days(self, tech: str, now: datetime) -> int:
+        """Search window in days: since the last fetch, or the full age window"""
+        last_fetch = self.last_fetch(tech)
+        if last_fetch is None:
+            return self.max_age_days
+        elapsed = now - last_fetch
+        return min(self.max_age_days, max(1, elapsed.days + 1))
+
+    def known_urls(self, tech: str) -> set:
+        return set(self.read(tech)["articles"])
+
+    def merge(
+        self, tech: str, articles: List[Dict[str, Any]], fetched_at: datetime
+    ) -> List[Dict[str, Any]]:
+        """Add new articles, apply the retention bounds and return the history"""
+        with self.lock(tech):
+            entry = self.load(tech)
+            for article in articles:
+                article.setdefault("fetched_at", fetched_at.isoformat())
+                entry["articles"].setdefault(article["url"], article)
+            entry["last_fetch"] = fetched_at.isoformat()
+            entry["articles"] = {
+                article["url"]: article
+                for article in self.retained(entry["articles"].values(), fetched_at)
+            }
+            self.save(tech, entry)
+        return list(entry["articles"].values())
+
+    def retained(self, articles, now: datetime) -> List[Dict[str, Any]]:
+        """Articles within the age window, newest first, capped at max_articles"""
+        cutoff = (now - timedelta(days=self.max_age_days)).isoformat()
+        recent = [a for a in articles if self.article_time(a) >= cutoff]
+        recent.sort(key=self.article_time, reverse=True)
+        return recent[: self.max_articles]
+
+    @staticmethod
+    def article_time(article: Dict[str, Any]) -> str:
+        return article.get("published") or article["fetched_at"]
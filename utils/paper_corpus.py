@@ -0,0 +1,161 @@
+import os
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from filelock import FileLock
+from utils.data_manager import write_json_atomic
+
+DEFAULT_TERM_PAPERS = 30
+DEFAULT_MAX_TERMS = 40
+
+
+class PaperCorpus:
+    """Local arXiv paper corpus indexed by arXiv ID and keyword
+
+    Stored as one JSON file guarded by a file lock, so several processes can
+    sync and read it safely. Per keyword it keeps the paper IDs, the
+    publication time of the newest stored paper (where the next sync
+    resumes) and which papers have already been summarized. Extracted terms
+    are kept per summarized batch and age out: only batches covering the
+    most recent term_papers papers count, capped at max_terms terms.
+    """
+
+    def __init__(
+        self,
+        corpus_dir: Optional[str] = None,
+        data_dir: str = "./data",
+        term_papers: Optional[int] = None,
+        max_terms: Optional[int] = None,
+    ):
+        self.corpus_dir = (
+            corpus_dir
+            or os.getenv("PAPER_CORPUS_DIR")
+            or os.path.join(data_dir, "paper_corpus")
+        )
+        self.term_papers = term_papers or int(
+            os.getenv("TECH_TERMS_MAX_PAPERS", DEFAULT_TERM_PAPERS)
+        )
+        self.max_terms = max_terms or int(
+            os.getenv("TECH_TERMS_MAX", DEFAULT_MAX_TERMS)
+        )
+        os.makedirs(self.corpus_dir, exist_ok=True)
+        self.path = os.path.join(self.corpus_dir, "corpus.json")
+        self.lock = FileLock(f"{self.path}.lock", thread_local=False)
+
+    def load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"papers": {}, "keywords": {}}
+
+    def save(self, corpus: Dict[str, Any]) -> None:
+        write_json_atomic(self.path, corpus)
+
+    def keyword_entry(self, corpus: Dict[str, Any], keyword: str) -> Dict[str, Any]:
+        return corpus["keywords"].setdefault(
+            keyword,
+            {"ids": [], "last_sync": None, "summarized_ids": [], "term_batches": []},
+        )
+
+    def last_sync(self, keyword: str) -> Optional[datetime]:
+        """Publication time of the newest paper stored for a keyword, or None"""
+        entry = self.load()["keywords"].get(keyword)
+        if not entry or not entry["last_sync"]:
+            return None
+        return datetime.fromisoformat(entry["last_sync"])
+
+    def merge(
+        self,
+        keyword: str,
+        papers: List[Dict[str, Any]],
+        floor: Optional[datetime] = None,
+    ) -> List[str]:
+        """Add fetched papers to a keyword and return the IDs that were new
+
+        The keyword's sync point advances to the newest paper stored, and
+        never stays before floor (the start of the collection window).
+        """
+        with self.lock:
+            corpus = self.load()
+            entry = self.keyword_entry(corpus, keyword)
+            known = set(entry["ids"])
+            new_ids = []
+            for paper in papers:
+                corpus["papers"].setdefault(paper["id"], paper)
+                if paper["id"] not in known:
+                    known.add(paper["id"])
+                    entry["ids"].append(paper["id"])
+                    new_ids.append(paper["id"])
+            published = [datetime.fromisoformat(p["published"]) for p in papers]
+            if entry["last_sync"]:
+                published.append(datetime.fromisoformat(entry["last_sync"]))
+            if floor is not None:
+                published.append(floor)
+            if published:
+                entry["last_sync"] = max(published).isoformat()
+            self.save(corpus)
+        return new_ids
+
+    def papers_for(self, keyword: str) -> List[Dict[str, Any]]:
+        """All cached papers of a keyword, newest first"""
+        corpus = self.load()
+        entry = corpus["keywords"].get(keyword, {"ids": []})
+        papers = [corpus["papers"][paper_id] for paper_id in entry["ids"]]
+        return sorted(papers, key=lambda p: p["published"], reverse=True)
+
+    def summarized(self, keyword: str) -> Dict[str, Any]:
+        """IDs already summarized for a keyword and its current terms"""
+        entry = self.load()["keywords"].get(keyword)
+        if not entry:
+            return {"ids": set(), "terms": []}
+        return {
+            "ids": set(entry["summarized_ids"]),
+            "terms": self.current_terms(entry.get("term_batches", [])),
+        }
+
+    def mark_summarized(
+        self,
+        keyword: str,
+        papers: List[Dict[str, Any]],
+        terms: List[str],
+    ) -> List[str]:
+        """Record a summarized batch of papers and return the keyword's terms"""
+        with self.lock:
+            corpus = self.load()
+            entry = self.keyword_entry(corpus, keyword)
+            done = set(entry["summarized_ids"])
+            entry["summarized_ids"].extend(
+                p["id"] for p in papers if p["id"] not in done
+            )
+            # Term lists of corpora written before batches were kept
+            entry.pop("terms", None)
+            batches = entry.setdefault("term_batches", [])
+            batches.append(
+                {
+                    "papers": len(papers),
+                    "published": max(p["published"] for p in papers),
+                    "terms": terms,
+                }
+            )
+            entry["term_batches"] = self.recent_batches(batches)
+            self.save(corpus)
+        return self.current_terms(entry["term_batches"])
+
+    def recent_batches(self, batches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Newest batches covering the most recent term_papers papers"""
+        recent = []
+        papers = 0
+        for batch in sorted(batches, key=lambda b: b["published"], reverse=True):
+            if papers >= self.term_papers:
+                break
+            recent.append(batch)
+            papers += batch["papers"]
+        return recent
+
+    def current_terms(self, batches: List[Dict[str, Any]]) -> List[str]:
+        """Distinct terms of the recent batches, newest first, at most max_terms"""
+        terms = dict.fromkeys(
+            term for batch in self.recent_batches(batches) for term in batch["terms"]
+        )
+        return list(terms)[: self.max_terms]
@@ -0,0 +1,153 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import (
+    SimpleDocTemplate,
+    PageBreak,
+    Paragraph,
+    Spacer,
+    Table,
+    TableStyle,
+)
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # Optional: without pypdf the report renders in one process
+    PdfWriter = None
+
+
+# Styles are built once per process and shared by every section
+STYLES = getSampleStyleSheet()
+TITLE_STYLE = ParagraphStyle(
+    "CustomTitle", parent=STYLES["Heading1"], fontSize=24, spaceAfter=30
+)
+HEADING_STYLE = ParagraphStyle(
+    "CustomHeading", parent=STYLES["Heading2"], fontSize=18, spaceAfter=20
+)
+NORMAL_STYLE = STYLES["Normal"]
+
+METRICS_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, 0), 14),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+        ("TEXTCOLOR", (0, 1), (-1, -1), colors.black),
+        ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
+        ("FONTSIZE", (0, 1), (-1, -1), 12),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+    ]
+)
+
+METRIC_ROWS = [
+    ("Market Adoption", "market_adoption"),
+    ("Research Activity", "research_activity"),
+    ("Investment Interest", "investment_interest"),
+    ("Media Coverage", "media_coverage"),
+    ("Future Potential", "future_potential"),
+    ("Total Score", "total_score"),
+]
+
+PARAGRAPH_STYLES = {
+    "title": TITLE_STYLE,
+    "heading": HEADING_STYLE,
+    "paragraph": NORMAL_STYLE,
+}
+
+# A section is a list of picklable (kind, value) blocks, so it can be
+# rendered in a worker process
+Block = Tuple[str, Any]
+
+
+def metrics_table(metrics: Dict[str, float]) -> Table:
+    """Metrics table of a technology using the shared table style"""
+    metrics_data = [["Metric", "Value"]] + [
+        [label, f"{metrics.get(key, 0)}"] for label, key in METRIC_ROWS
+    ]
+    table = Table(metrics_data, colWidths=[200, 100])
+    table.setStyle(METRICS_TABLE_STYLE)
+    return table
+
+
+def build_flowables(blocks: List[Block]) -> List:
+    """Turn section blocks into reportlab flowables"""
+    elements = []
+    for kind, value in blocks:
+        if kind == "spacer":
+            elements.append(Spacer(1, value))
+        elif kind == "page_break":
+            elements.append(PageBreak())
+        elif kind == "metrics_table":
+            elements.append(metrics_table(value))
+        else:
+            elements.append(Paragraph(value, PARAGRAPH_STYLES[kind]))
+    return elements
+
+
+def render_section(path: str, blocks: List[Block]) -> str:
+    """Render one section to its own PDF file"""
+    doc = SimpleDocTemplate(path, pagesize=letter)
+    doc.build(build_flowables(blocks))
+    return path
+
+
+def default_workers() -> int:
+    return int(os.getenv("PDF_RENDER_WORKERS", os.cpu_count() or 1))
+
+
+def share_workers(jobs: int) -> None:
+    """Split the CPUs between jobs rendering at the same time
+
+    Batch and service runs render several reports at once; without this each
+    report would start a pool as large as the machine. An explicit
+    PDF_RENDER_WORKERS is left alone.
+    """
+    os.environ.setdefault(
+        "PDF_RENDER_WORKERS", str(max(1, (os.cpu_count() or 1) // max(jobs, 1)))
+    )
+
+
+def render_report(
+    report_path: str, sections: List[List[Block]], workers: Optional[int] = None
+) -> str:
+    """Render sections in a process pool and merge them into one PDF
+
+    Each section starts on a new page. Falls back to a single document built
+    in this process, with a page break between sections, when there is one
+    worker, one section or no pypdf.
+    """
+    workers = min(workers or default_workers(), len(sections))
+    if workers <= 1 or PdfWriter is None:
+        blocks = []
+        for i, section in enumerate(sections):
+            if i:
+                blocks.append(("page_break", None))
+            blocks.extend(section)
+        return render_section(report_path, blocks)
+
+    part_dir = tempfile.mkdtemp(prefix="report_parts_")
+    try:
+        part_paths = [
+            os.path.join(part_dir, f"part_{i:04d}.pdf") for i in range(len(sections))
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(render_section, part_paths, sections))
+
+        writer = PdfWriter()
+        for part_path in part_paths:
+            writer.append(part_path)
+        with open(report_path, "wb") as f:
+            writer.write(f)
+        writer.close()
+    finally:
+        shutil.rmtree(part_dir, ignore_errors=True)
+
+    return report_path
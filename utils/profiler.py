@@ -0,0 +1,120 @@
+import os
+import sys
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class StackSampler(threading.Thread):
+    """Samples the stacks of all other threads into collapsed-stack counts"""
+
+    def __init__(self, interval: float = 0.005):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                        f":{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+
+    def write(self, path: str) -> None:
+        """Write counts in the collapsed format read by flamegraph.pl and speedscope"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class AgentProfiler:
+    """cProfile, tracemalloc and a wall-clock stack sampler around each agent run
+
+    For every profiled agent it writes into output_dir:
+    <agent>.pstats (cProfile dump), <agent>.txt (top functions by cumulative
+    time), <agent>.collapsed (sampled stacks of all threads, for flamegraphs)
+    and <agent>.alloc.txt (top allocation sites alive at the end of the run).
+    cProfile only sees the agent's own thread; work in asyncio.to_thread
+    workers shows up in the sampled stacks, work in child processes does not.
+    """
+
+    def __init__(
+        self, output_dir: str, interval: float = 0.005, top_allocations: int = 25
+    ):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.top_allocations = top_allocations
+        os.makedirs(output_dir, exist_ok=True)
+
+    @contextmanager
+    def profile(self, name: str) -> Iterator[None]:
+        was_tracing = tracemalloc.is_tracing()
+        if was_tracing:
+            tracemalloc.reset_peak()
+        else:
+            tracemalloc.start()
+        sampler = StackSampler(self.interval)
+        profiler = cProfile.Profile()
+        sampler.start()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            sampler.stop()
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if not was_tracing:
+                tracemalloc.stop()
+            self.write(name, profiler, sampler, snapshot, current, peak)
+
+    def write(
+        self,
+        name: str,
+        profiler: cProfile.Profile,
+        sampler: StackSampler,
+        snapshot: tracemalloc.Snapshot,
+        current: int,
+        peak: int,
+    ) -> None:
+        base = os.path.join(self.output_dir, name)
+        profiler.dump_stats(f"{base}.pstats")
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(40)
+        sampler.write(f"{base}.collapsed")
+
+        snapshot = snapshot.filter_traces(
+            [
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            ]
+        )
+        with open(f"{base}.alloc.txt", "w", encoding="utf-8") as f:
+            f.write(
+                f"Traced memory: {current / 2**20:.1f} MiB current, "
+                f"{peak / 2**20:.1f} MiB peak\n\n"
+            )
+            for stat in snapshot.statistics("lineno")[: self.top_allocations]:
+                f.write(f"{stat}\n")
+
+        print(f"Profile of {name} written to {base}.*")
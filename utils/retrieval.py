@@ -0,0 +1,250 @@
+import os
+import re
+import zlib
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+DEFAULT_N_FEATURES = 4096
+DEFAULT_TOP_K = 8
+DEFAULT_TOKEN_BUDGET = 1500
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a prompt passage (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def format_passage(passage: Dict[str, Any]) -> str:
+    """Format a passage the way agents put articles into prompts"""
+    return f"Title: {passage['title']}\nSummary: {passage['summary']}"
+
+
+class RetrievalIndex:
+    """Hashed TF-IDF index over passages with cosine top-k search (CPU only)
+
+    Passage vectors are kept as sparse rows in CSR layout: the buckets and
+    weights of row i are indices[indptr[i]:indptr[i + 1]] and the same slice
+    of weights, so memory grows with the number of distinct terms rather
+    than with passages x n_features.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_N_FEATURES):
+        self.n_features = n_features
+        self.passages: List[Dict[str, Any]] = []
+        self.idf = np.ones(n_features, dtype=np.float32)
+        self.indptr = np.zeros(1, dtype=np.intp)
+        self.indices = np.zeros(0, dtype=np.intp)
+        self.weights = np.zeros(0, dtype=np.float32)
+        self.rows_by_key: Dict[Tuple[str, str], List[int]] = {}
+        self._buckets: Dict[str, int] = {}
+
+    def _bucket(self, token: str) -> int:
+        bucket = self._buckets.get(token)
+        if bucket is None:
+            bucket = zlib.crc32(token.encode("utf-8")) % self.n_features
+            self._buckets[token] = bucket
+        return bucket
+
+    def _term_counts(
+        self, texts: List[str]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Sparse (indptr, buckets, counts) term counts of the texts"""
+        buckets = []
+        lengths = []
+        for text in texts:
+            tokens = TOKEN_PATTERN.findall(text.lower())
+            buckets.extend(self._bucket(token) for token in tokens)
+            lengths.append(len(tokens))
+        row_ids = np.repeat(np.arange(len(texts)), lengths)
+        keys, counts = np.unique(
+            row_ids * self.n_features + np.asarray(buckets, dtype=np.intp),
+            return_counts=True,
+        )
+        indptr = np.searchsorted(keys // self.n_features, np.arange(len(texts) + 1))
+        return (
+            indptr.astype(np.intp),
+            (keys % self.n_features).astype(np.intp),
+            counts.astype(np.float32),
+        )
+
+    def _weight(
+        self, indptr: np.ndarray, indices: np.ndarray, counts: np.ndarray
+    ) -> np.ndarray:
+        """L2-normalized log1p(tf) * idf weights of sparse term counts"""
+        weighted = np.log1p(counts) * self.idf[indices]
+        row_ids = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+        norms = np.sqrt(
+            np.bincount(row_ids, weights=weighted**2, minlength=len(indptr) - 1)
+        )
+        norms[norms == 0] = 1.0
+        return (weighted / norms[row_ids]).astype(np.float32)
+
+    def _query_vector(self, query: str) -> np.ndarray:
+        indptr, indices, counts = self._term_counts([query])
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        vector[indices] = self._weight(indptr, indices, counts)
+        return vector
+
+    def _scores(self, rows: np.ndarray, query_vector: np.ndarray) -> np.ndarray:
+        """Cosine scores of the given rows against a dense query vector"""
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+        contributions = self.weights[positions] * query_vector[self.indices[positions]]
+        return np.bincount(
+            np.repeat(np.arange(len(rows)), lengths),
+            weights=contributions,
+            minlength=len(rows),
+        )
+
+    def build(self, passages: List[Dict[str, Any]]) -> "RetrievalIndex":
+        """Index passages; each needs "title" and "summary" keys"""
+        self.passages = list(passages)
+        indptr, indices, counts = self._term_counts(
+            [format_passage(p) for p in self.passages]
+        )
+        document_freq = np.bincount(indices, minlength=self.n_features)
+        self.idf = (np.log((1 + len(self.passages)) / (1 + document_freq)) + 1).astype(
+            np.float32
+        )
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = self._weight(indptr, indices, counts)
+        return self
+
+    def search(
+        self,
+        query: str,
+        top_k: int = DEFAULT_TOP_K,
+        candidates: Optional[Sequence[int]] = None,
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """Return up to top_k (score, passage) pairs ranked by similarity
+
+        Without candidates only passages with positive similarity are
+        returned. Candidates restrict the search to those passage rows; they
+        are known to be relevant already, so they are all ranked even when
+        they share no term with the query.
+        """
+        if not self.passages or top_k <= 0:
+            return []
+
+        rows = np.arange(len(self.passages))
+        if candidates is not None:
+            rows = np.asarray(candidates, dtype=np.intp)
+            if not len(rows):
+                return []
+        scores = self._scores(rows, self._query_vector(query))
+        if top_k < len(scores):
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(len(scores))
+        ranked = best[np.argsort(-scores[best], kind="stable")]
+        return [
+            (float(scores[i]), self.passages[rows[i]])
+            for i in ranked
+            if candidates is not None or scores[i] > 0
+        ]
+
+    def select_passages(
+        self,
+        query: str,
+        max_tokens: int = DEFAULT_TOKEN_BUDGET,
+        top_k: int = DEFAULT_TOP_K,
+        candidates: Optional[Sequence[int]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Most relevant passages for the query that fit in the token budget"""
+        selected = []
+        used_tokens = 0
+        for _, passage in self.search(query, top_k, candidates):
+            tokens = estimate_tokens(format_passage(passage))
+            if used_tokens + tokens > max_tokens:
+                continue
+            selected.append(passage)
+            used_tokens += tokens
+        return selected
+
+
+def load_retrieval_config() -> Dict[str, int]:
+    """Read retrieval settings from the environment"""
+    return {
+        "top_k": int(os.getenv("RETRIEVAL_TOP_K", DEFAULT_TOP_K)),
+        "max_tokens": int(os.getenv("RETRIEVAL_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET)),
+    }
+
+
+def build_evidence_index(state: Dict[str, Any]) -> RetrievalIndex:
+    """Index every collected paper and news article of the state
+
+    Passages keep the keyword (papers) or technology (news) they were
+    collected for in "key", so each technology can be scoped to its own
+    sources.
+    """
+    passages = []
+    for keyword, papers in state.get("collected_papers", {}).items():
+        for paper in papers:
+            passages.append(
+                {
+                    "source": "paper",
+                    "key": keyword,
+                    "title": paper["title"],
+                    "summary": paper["summary"],
+                }
+            )
+    for tech, articles in state.get("collected_news", {}).items():
+        seen = set()
+        for article in articles:
+            if article["title"] in seen:
+                continue
+            seen.add(article["title"])
+            passages.append(
+                {
+                    "source": "news",
+                    "key": tech,
+                    "title": article["title"],
+                    "summary": article["summary"],
+                }
+            )
+
+    index = RetrievalIndex().build(passages)
+    for row, passage in enumerate(passages):
+        index.rows_by_key.setdefault((passage["source"], passage["key"]), []).append(
+            row
+        )
+    state["evidence_index"] = index
+    return index
+
+
+def get_evidence_index(state: Dict[str, Any]) -> RetrievalIndex:
+    """Evidence index of the state, building it if needed"""
+    if "evidence_index" not in state:
+        return build_evidence_index(state)
+    return state["evidence_index"]
+
+
+def select_tech_passages(
+    state: Dict[str, Any],
+    tech: str,
+    max_tokens: int = DEFAULT_TOKEN_BUDGET,
+    top_k: int = DEFAULT_TOP_K,
+) -> List[Dict[str, Any]]:
+    """Evidence of one technology, ranked within its own papers and news
+
+    Candidates are the technology's news and the papers of the keywords it
+    was extracted from; the query is the technology plus those keywords.
+    """
+    index = get_evidence_index(state)
+    keywords = [
+        keyword
+        for keyword, techs in state.get("summarized_tech", {}).items()
+        if tech in techs
+    ]
+    candidates = sorted(
+        row
+        for key in [("news", tech), *(("paper", keyword) for keyword in keywords)]
+        for row in index.rows_by_key.get(key, [])
+    )
+    query = " ".join([tech, *keywords])
+    return index.select_passages(query, max_tokens, top_k, candidates)
@@ -0,0 +1,96 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+SECTION_PATTERN = re.compile(
+    r"^[#*\s]*(RISKS|OPPORTUNITIES)\b[*\s]*:?[*\s]*$", re.IGNORECASE
+)
+# The number must be followed by whitespace, so "3.5 billion" is not an item
+ITEM_PATTERN = re.compile(r"^(?:#+\s*)?\**\s*\d+\s*[.)]\**\s+(.+)$")
+FIELD_PATTERN = re.compile(
+    r"^[-*•]\s*\**\s*([A-Za-z][A-Za-z ]*?)\s*\**\s*:\s*\**\s*(.*)$"
+)
+
+Item = Dict[str, str]
+
+
+class RiskAnalysisParser:
+    """Single-pass incremental parser for the risk/opportunity response format
+
+    Feed text chunks as they stream in; each call returns the items that
+    were completed by that chunk as (section, item) pairs. An item is
+    complete when the next item or section starts, or when the stream is
+    closed. Lines that fit no pattern are attached to the previous field or
+    ignored, so a malformed response never raises.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.section: Optional[str] = None
+        self.item: Optional[Item] = None
+        self.item_section: Optional[str] = None
+        self.field: Optional[str] = None
+        self.results: Dict[str, List[Item]] = {"risks": [], "opportunities": []}
+
+    def feed(self, chunk: str) -> List[Tuple[str, Item]]:
+        """Consume a chunk and return the items it completed"""
+        self.buffer += chunk
+        *lines, self.buffer = self.buffer.split("\n")
+        completed = []
+        for line in lines:
+            self.parse_line(line, completed)
+        return completed
+
+    def close(self) -> List[Tuple[str, Item]]:
+        """Consume the rest of the stream and return the final items"""
+        completed = []
+        if self.buffer:
+            self.parse_line(self.buffer, completed)
+            self.buffer = ""
+        self.finish_item(completed)
+        return completed
+
+    def result(self) -> Dict[str, List[Item]]:
+        return self.results
+
+    def parse_line(self, line: str, completed: List[Tuple[str, Item]]) -> None:
+        line = line.strip()
+        if not line:
+            return
+
+        section = SECTION_PATTERN.match(line)
+        if section:
+            self.finish_item(completed)
+            self.section = section.group(1).lower()
+            return
+
+        item = ITEM_PATTERN.match(line)
+        if item and self.section:
+            self.finish_item(completed)
+            self.item = {"title": item.group(1).strip(" *[]")}
+            self.item_section = self.section
+            return
+
+        if self.item is None:
+            return
+        field = FIELD_PATTERN.match(line)
+        if field:
+            self.field = field.group(1).strip().lower()
+            self.item[self.field] = field.group(2).strip(" *")
+        elif self.field:
+            # Wrapped continuation of the previous field
+            self.item[self.field] = f"{self.item[self.field]} {line}".strip()
+
+    def finish_item(self, completed: List[Tuple[str, Item]]) -> None:
+        if self.item is not None:
+            self.results[self.item_section].append(self.item)
+            completed.append((self.item_section, self.item))
+        self.item = None
+        self.field = None
+
+
+def parse_risk_analysis(content: str) -> Dict[str, List[Item]]:
+    """Parse a complete response into risks and opportunities"""
+    parser = RiskAnalysisParser()
+    parser.feed(content)
+    parser.close()
+    return parser.result()
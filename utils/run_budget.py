@@ -0,0 +1,195 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
+from utils.retrieval import estimate_tokens
+
+# Budget pressure (share of the deadline or token budget used) at which
+# each degradation step kicks in
+FEWER_PAPERS_PRESSURE = 0.3
+FEWER_TERMS_PRESSURE = 0.3
+FEWER_ARTICLES_PRESSURE = 0.4
+TOP_K_PRESSURE = 0.5
+FAST_RISK_PRESSURE = 0.6
+SHORT_SECTIONS_PRESSURE = 0.6
+SKIP_DEEP_DIVE_PRESSURE = 0.8
+SKIP_RISK_PRESSURE = 0.9
+EXHAUSTED_PRESSURE = 1.0
+
+DEFAULT_TOP_K = 5
+REDUCED_PAPERS = 5
+REDUCED_TERMS = 20
+REDUCED_ARTICLES = 5
+SHORT_SECTION_WORDS = 250
+
+# Budget of the run the current agent belongs to, for token accounting
+current_budget: ContextVar[Optional["RunBudget"]] = ContextVar(
+    "current_budget", default=None
+)
+
+
+class BudgetExhausted(Exception):
+    """Raised instead of starting an LLM call once the run budget is used up"""
+
+
+class RunBudget:
+    """Run deadline and LLM token budget consulted by the agents
+
+    Pressure is the larger of the elapsed share of the deadline and the used
+    share of the token budget. Agents ask for their degradation steps when
+    they start and per item; every step applied is recorded once so the
+    report can list it. Once the budget is used up the router refuses new
+    calls with BudgetExhausted and the agents fall back to what they have.
+    Without a deadline or token budget nothing is ever degraded.
+    """
+
+    def __init__(
+        self,
+        deadline: Optional[float] = None,
+        token_budget: Optional[int] = None,
+        top_k: int = DEFAULT_TOP_K,
+    ):
+        self.deadline = deadline
+        self.token_budget = token_budget
+        self.top_k = top_k
+        self.started_at = time.monotonic()
+        self.tokens_used = 0
+        self.degradations: List[str] = []
+        self.applied: Set[Tuple[str, str]] = set()
+
+    @classmethod
+    def from_env(cls) -> "RunBudget":
+        deadline = os.getenv("RUN_DEADLINE_SECONDS")
+        token_budget = os.getenv("RUN_TOKEN_BUDGET")
+        return cls(
+            deadline=float(deadline) if deadline else None,
+            token_budget=int(token_budget) if token_budget else None,
+            top_k=int(os.getenv("RUN_BUDGET_TOP_K", DEFAULT_TOP_K)),
+        )
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def pressure(self) -> float:
+        """Share of the tighter budget already used (0 when unbounded)"""
+        pressure = 0.0
+        if self.deadline:
+            pressure = max(pressure, self.elapsed() / self.deadline)
+        if self.token_budget:
+            pressure = max(pressure, self.tokens_used / self.token_budget)
+        return pressure
+
+    def record_usage(self, messages: List[Any], response: Any) -> None:
+        """Count a call's tokens, estimating them when the model reports none"""
+        usage = getattr(response, "usage_metadata", None)
+        if usage:
+            self.tokens_used += usage.get("total_tokens", 0)
+        else:
+            text = "".join(str(m.content) for m in messages) + str(response.content)
+            self.tokens_used += estimate_tokens(text)
+
+    def degrade(self, stage: str, description: str) -> None:
+        """Record a degradation step; steps repeated per item are listed once"""
+        if (stage, description) in self.applied:
+            return
+        self.applied.add((stage, description))
+        degradation = (
+            f"{stage}: {description} (at {self.elapsed():.0f}s, "
+            f"{self.tokens_used} tokens, {self.pressure():.0%} of budget)"
+        )
+        self.degradations.append(degradation)
+        print(f"Budget degradation - {degradation}")
+
+    def exhausted(self, stage: str) -> bool:
+        """Whether the budget is used up, checked before every LLM call"""
+        if self.pressure() < EXHAUSTED_PRESSURE:
+            return False
+        self.degrade(stage, "remaining LLM calls skipped, budget used up")
+        return True
+
+    def limit_papers(self, stage: str, papers: List[Any]) -> List[Any]:
+        """New papers to summarize per keyword; the rest wait for the next run"""
+        if self.pressure() < FEWER_PAPERS_PRESSURE or len(papers) <= REDUCED_PAPERS:
+            return papers
+        self.degrade(
+            stage, f"at most {REDUCED_PAPERS} new papers summarized per keyword"
+        )
+        return papers[:REDUCED_PAPERS]
+
+    def limit_terms(self, stage: str, terms: List[str]) -> List[str]:
+        """Technology terms to score, in the caller's priority order"""
+        if self.pressure() < FEWER_TERMS_PRESSURE or len(terms) <= REDUCED_TERMS:
+            return terms
+        self.degrade(stage, f"{REDUCED_TERMS} of {len(terms)} technologies scored")
+        return terms[:REDUCED_TERMS]
+
+    def article_limit(self, stage: str, default: int) -> int:
+        """Articles to fetch per technology"""
+        if self.pressure() < FEWER_ARTICLES_PRESSURE or default <= REDUCED_ARTICLES:
+            return default
+        self.degrade(
+            stage, f"{REDUCED_ARTICLES} instead of {default} articles per technology"
+        )
+        return REDUCED_ARTICLES
+
+    def limit_techs(self, stage: str, techs: List[str]) -> List[str]:
+        """Technologies to carry on with, best scores first"""
+        if self.pressure() < TOP_K_PRESSURE or len(techs) <= self.top_k:
+            return techs
+        self.degrade(stage, f"top {self.top_k} of {len(techs)} technologies only")
+        return techs[: self.top_k]
+
+    def skip_deep_dive(self, stage: str) -> bool:
+        """Whether to leave out the per-technology analyses"""
+        if self.pressure() < SKIP_DEEP_DIVE_PRESSURE:
+            return False
+        self.degrade(stage, "per-technology analyses skipped")
+        return True
+
+    def skip_risk_analysis(self, stage: str) -> bool:
+        """Whether to leave out the risk analysis of a technology"""
+        if self.pressure() < SKIP_RISK_PRESSURE:
+            return False
+        self.degrade(stage, "risk analyses of the remaining technologies skipped")
+        return True
+
+    def fast_risk_analysis(self, stage: str) -> bool:
+        """Whether to run the risk analysis of a technology on the fast model"""
+        if self.pressure() < FAST_RISK_PRESSURE:
+            return False
+        self.degrade(stage, "risk analyses run on the fast model")
+        return True
+
+    def section_words(self, stage: str) -> Optional[int]:
+        """Word limit of each technology analysis, or None for full sections"""
+        if self.pressure() < SHORT_SECTIONS_PRESSURE:
+            return None
+        self.degrade(
+            stage, f"technology analyses shortened to {SHORT_SECTION_WORDS} words"
+        )
+        return SHORT_SECTION_WORDS
+
+
+def check_budget(task: str) -> None:
+    """Raise BudgetExhausted if the current run's budget is used up"""
+    budget = current_budget.get()
+    if budget is not None and budget.exhausted(task.split(".", 1)[0]):
+        raise BudgetExhausted(f"{task} skipped, run budget used up")
+
+
+def get_run_budget(state: Dict[str, Any]) -> RunBudget:
+    """Budget of the run, an unbounded one for states created without it"""
+    if state.get("run_budget") is None:
+        state["run_budget"] = RunBudget()
+    return state["run_budget"]
+
+
+@contextmanager
+def use_budget(budget: Optional[RunBudget]) -> Iterator[None]:
+    """Charge LLM calls made inside the block to the given budget"""
+    token = current_budget.set(budget)
+    try:
+        yield
+    finally:
+        current_budget.reset(token)
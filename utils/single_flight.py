@@ -0,0 +1,50 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Coalesce concurrent async calls with the same key into one call
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it is in flight await the same task. A cancelled caller does not
+    cancel the shared task, so the remaining callers still get the result.
+    Work that cannot run as a task, such as a stream consumed by its caller,
+    is registered with lead() and completed by the caller.
+    """
+
+    def __init__(self):
+        self.calls: Dict[Hashable, asyncio.Future] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self.join(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self.register(key, task)
+        return await asyncio.shield(task)
+
+    def join(self, key: Hashable) -> Optional[asyncio.Future]:
+        """Call in flight for the key on the running loop, or None"""
+        future = self.calls.get(key)
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            return None
+        self.coalesced += 1
+        return future
+
+    def lead(self, key: Hashable) -> asyncio.Future:
+        """Register a call whose result the caller sets on the returned future"""
+        future = asyncio.get_running_loop().create_future()
+        # Without followers nobody retrieves the leader's error
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.register(key, future)
+        return future
+
+    def register(self, key: Hashable, future: asyncio.Future) -> None:
+        self.calls[key] = future
+        self.started += 1
+        future.add_done_callback(lambda f: self.forget(key, f))
+
+    def forget(self, key: Hashable, future: asyncio.Future) -> None:
+        if self.calls.get(key) is future:
+            del self.calls[key]
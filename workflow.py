@@ -1,32 +1,44 @@
-from typing import Dict, Any, List
+import os
+from datetime import datetime
+from typing import Dict, Any, List, Optional
 from langgraph.graph import Graph
+from agents.base_agent import BaseAgent
 from agents.research_collector import ResearchCollectorAgent
 from agents.tech_summarizer import TechSummarizerAgent
 from agents.trend_predictor import TrendPredictorAgent
 from agents.news_collector import NewsCollectorAgent
 from agents.risk_analyzer import RiskAnalyzerAgent
 from agents.report_generator import ReportGeneratorAgent
+from utils.llm_router import get_router
+from utils.hedging import latency_stats
+from utils.profiler import AgentProfiler
+from utils.run_budget import RunBudget
 
 
-def create_workflow() -> Graph:
+def create_workflow(
+    use_async: bool = False, data_dir: str = "./data", output_dir: str = "outputs"
+) -> Graph:
     # Initialize agents
-    research_collector = ResearchCollectorAgent()
-    tech_summarizer = TechSummarizerAgent()
-    trend_predictor = TrendPredictorAgent()
-    news_collector = NewsCollectorAgent()
-    risk_analyzer = RiskAnalyzerAgent()
-    report_generator = ReportGeneratorAgent()
+    research_collector = ResearchCollectorAgent(data_dir)
+    tech_summarizer = TechSummarizerAgent(data_dir)
+    trend_predictor = TrendPredictorAgent(data_dir)
+    news_collector = NewsCollectorAgent(data_dir)
+    risk_analyzer = RiskAnalyzerAgent(data_dir)
+    report_generator = ReportGeneratorAgent(data_dir, output_dir)
+    # Technology analyses start as soon as that technology's risks are known
+    risk_analyzer.on_tech_complete = report_generator.prefetch_tech_analysis
 
     # Create workflow graph
     workflow = Graph()
 
-    # Add nodes
-    workflow.add_node("research_collector", research_collector.run)
-    workflow.add_node("tech_summarizer", tech_summarizer.run)
-    workflow.add_node("trend_predictor", trend_predictor.run)
-    workflow.add_node("news_collector", news_collector.run)
-    workflow.add_node("risk_analyzer", risk_analyzer.run)
-    workflow.add_node("report_generator", report_generator.run)
+    # Add nodes (async nodes require the graph to be run with ainvoke)
+    node = (lambda agent: agent.arun) if use_async else (lambda agent: agent.run)
+    workflow.add_node("research_collector", node(research_collector))
+    workflow.add_node("tech_summarizer", node(tech_summarizer))
+    workflow.add_node("trend_predictor", node(trend_predictor))
+    workflow.add_node("news_collector", node(news_collector))
+    workflow.add_node("risk_analyzer", node(risk_analyzer))
+    workflow.add_node("report_generator", node(report_generator))
 
     # Define edges
     workflow.add_edge("research_collector", "tech_summarizer")
@@ -37,14 +49,24 @@ def create_workflow() -> Graph:
 
     # Set entry point
     workflow.set_entry_point("research_collector")
+    workflow.set_finish_point("report_generator")
 
     return workflow
 
 
-def run_workflow(keywords: List[str]) -> Dict[str, Any]:
-    """Run the complete workflow with given keywords"""
-    # Initialize state
-    initial_state = {
+def create_initial_state(
+    keywords: List[str],
+    data_dir: str = "",
+    output_dir: str = "",
+    budget: Optional[RunBudget] = None,
+) -> Dict[str, Any]:
+    """Create the empty workflow state for the given keywords
+
+    data_dir/output_dir override the agents' directories for this run only,
+    so one set of agents can serve runs that must not share stored outputs.
+    The run budget starts now; without one it is read from the environment.
+    """
+    return {
         "keyword_list": keywords,
         "collected_papers": {},
         "summarized_tech": {},
@@ -52,11 +74,51 @@ def run_workflow(keywords: List[str]) -> Dict[str, Any]:
         "collected_news": {},
         "risk_opportunity_analysis": {},
         "full_report": "",
+        "data_dir": data_dir,
+        "output_dir": output_dir,
+        "run_budget": budget or RunBudget.from_env(),
     }
 
+
+def run_workflow(
+    keywords: List[str],
+    data_dir: str = "./data",
+    output_dir: str = "outputs",
+    profile: bool = False,
+    budget: Optional[RunBudget] = None,
+) -> Dict[str, Any]:
+    """Run the complete workflow with given keywords
+
+    With profile=True every agent run is profiled into
+    <output_dir>/profile/<timestamp>/.
+    """
     # Create and run workflow
-    workflow = create_workflow()
+    workflow = create_workflow(data_dir=data_dir, output_dir=output_dir)
+    app = workflow.compile()
+    if profile:
+        BaseAgent.profiler = AgentProfiler(
+            os.path.join(
+                output_dir, "profile", datetime.now().strftime("%Y%m%d_%H%M%S")
+            )
+        )
+    try:
+        final_state = app.invoke(create_initial_state(keywords, budget=budget))
+    finally:
+        BaseAgent.profiler = None
+    print(get_router().format_stats())
+    print(latency_stats.format())
+
+    return final_state
+
+
+async def arun_workflow(
+    keywords: List[str], data_dir: str = "./data", output_dir: str = "outputs"
+) -> Dict[str, Any]:
+    """Run the complete workflow on the running event loop"""
+    workflow = create_workflow(use_async=True, data_dir=data_dir, output_dir=output_dir)
     app = workflow.compile()
-    final_state = app.invoke(initial_state)
+    final_state = await app.ainvoke(create_initial_state(keywords))
+    print(get_router().format_stats())
+    print(latency_stats.format())
 
     return final_state